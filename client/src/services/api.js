@@ -41,6 +41,20 @@ async function request(path, options = {}) {
   return text ? JSON.parse(text) : {};
 }
 
+// Compact payloads (compact=true) send each section's feedback as a key into
+// feedbackTexts; restore the sentences so pages see the full payload.
+function expandFeedback(data) {
+  const texts = data.feedbackTexts;
+  if (!texts) return data;
+  for (const cand of data.candidates || []) {
+    for (const sec of Object.values(cand.sections || {})) {
+      if (typeof sec.feedback === "number") sec.feedback = texts[sec.feedback];
+    }
+  }
+  delete data.feedbackTexts;
+  return data;
+}
+
 // ── Auth ───────────────────────────────────────────────────────────────────
 
 export async function apiRegister(name, email, password) {
@@ -69,6 +83,7 @@ export async function apiAnalyzeResumes(files, jobTitle = "", jobDesc = "") {
   for (const file of files) form.append("files", file);
   if (jobTitle) form.append("job_title", jobTitle);
   if (jobDesc) form.append("job_desc", jobDesc);
+  form.append("compact", "true");
 
   const res = await fetch(`${BASE_URL}/analyze`, {
     method: "POST",
@@ -85,7 +100,7 @@ export async function apiAnalyzeResumes(files, jobTitle = "", jobDesc = "") {
     throw new Error(message);
   }
 
-  return res.json();
+  return expandFeedback(await res.json());
 }
 
 // ── Batches (history) ──────────────────────────────────────────────────────
@@ -95,11 +110,15 @@ export async function apiGetBatches() {
 }
 
 export async function apiGetBatch(batchId) {
-  return request(`/batches/${batchId}`);
+  return expandFeedback(await request(`/batches/${batchId}?compact=true`));
+}
+
+export async function apiGetBatchStatus(batchId) {
+  return request(`/batches/${batchId}/status`);
 }
 
 export async function apiGetLatestBatch() {
-  return request("/latest-batch");
+  return expandFeedback(await request("/latest-batch?compact=true"));
 }
 
 // ── Health ─────────────────────────────────────────────────────────────────
@@ -1,9 +1,14 @@
 """
 JWT-based authentication utilities.
-Uses bcrypt directly (compatible with Python 3.14).
+Uses bcrypt directly (compatible with Python 3.14). Hashing runs on a small
+dedicated thread pool with a bounded queue, so a login burst is shed with 503s
+instead of occupying the request threadpool.
 """
 import os
+import asyncio
+import threading
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -16,9 +21,60 @@ SECRET_KEY = os.getenv("SECRET_KEY", "ranksense-secret")
 ALGORITHM  = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 10080))
 
+# Authenticated-user lookups are cached in-process for this many seconds (0 = off)
+USER_CACHE_TTL_S = float(os.getenv("USER_CACHE_TTL_S", 30))
+# Embed name/email/plan in tokens so requests can skip the users lookup entirely.
+# Claims are then only as fresh as the token.
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "0") == "1"
+USER_CLAIMS = ("name", "email", "plan", "joined")
+
+# bcrypt cost factor; existing hashes are upgraded/downgraded on the next login
+BCRYPT_ROUNDS  = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Concurrent hashes, and how many more may wait before requests are shed
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", 2))
+BCRYPT_QUEUE   = int(os.getenv("BCRYPT_QUEUE", 32))
+
+
+class HashingBusy(Exception):
+    """Raised when the password-hashing queue is full."""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(BCRYPT_WORKERS + BCRYPT_QUEUE)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+        return _executor
+
+
+async def _offload(fn, *args):
+    """Run fn on the hashing pool; raises HashingBusy instead of queueing without bound."""
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wrap_future(future)
+
+
+def shutdown_hashing():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
@@ -28,6 +84,22 @@ def verify_password(plain: str, hashed: str) -> bool:
         return False
 
 
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored hash was made with a different cost factor than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+async def hash_password_async(password: str) -> str:
+    return await _offload(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _offload(verify_password, plain, hashed)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -35,6 +107,32 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def user_token_claims(user: dict) -> dict:
+    """Token payload for a user row: always `sub`, plus profile claims in stateless mode."""
+    claims = {"sub": str(user["id"])}
+    if AUTH_STATELESS:
+        claims.update({
+            "name": user["name"],
+            "email": user["email"],
+            "plan": user["plan"],
+            "joined": user["created_at"].isoformat() if user.get("created_at") else None,
+        })
+    return claims
+
+
+def user_from_claims(payload: dict) -> Optional[dict]:
+    """Rebuild the current-user dict from a stateless token, or None if it lacks the claims."""
+    if not AUTH_STATELESS or any(c not in payload for c in USER_CLAIMS):
+        return None
+    return {
+        "id": int(payload["sub"]),
+        "name": payload["name"],
+        "email": payload["email"],
+        "plan": payload["plan"],
+        "created_at": datetime.fromisoformat(payload["joined"]) if payload["joined"] else None,
+    }
+
+
 def decode_token(token: str) -> Optional[dict]:
     try:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -0,0 +1,41 @@
+"""
+RankSense AI — Benchmark comparison
+Compares two result files from benchmarks/run.py by median time and exits
+non-zero when any shared benchmark regressed past --threshold.
+
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import sys, json, argparse
+
+
+def load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: dict, head: dict, threshold: float) -> int:
+    regressions = 0
+    names = [n for n in head["results"] if n in base["results"]]
+    width = max((len(n) for n in names), default=10)
+    print(f"base {base['commit']['sha'][:12]}  →  head {head['commit']['sha'][:12]}")
+    print(f"{'benchmark':<{width}}  {'base ms':>10}  {'head ms':>10}  {'change':>8}")
+    for name in names:
+        old, new = base["results"][name]["median_ms"], head["results"][name]["median_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<{width}}  {old:>10.3f}  {new:>10.3f}  {change:>+8.1%}{flag}")
+    for name in sorted(set(base["results"]) ^ set(head["results"])):
+        print(f"{name:<{width}}  (only in {'base' if name in base['results'] else 'head'})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+    sys.exit(1 if compare(load(args.base), load(args.head), args.threshold) else 0)
@@ -0,0 +1,137 @@
+"""
+RankSense AI — Synthetic resume corpus
+Deterministic resumes (seeded) of controllable length, written as PDF, DOCX or
+TXT. PDFs are assembled by hand (Helvetica text, one content stream per page)
+so the generator needs no PDF library and runs fully offline.
+
+    python -m benchmarks.corpus --out /tmp/corpus --count 50 --pages 2 --formats pdf,docx,txt
+"""
+import os, io, random, argparse
+from typing import List
+
+from resume_parser import TECH_KEYWORDS, LOCATIONS
+
+FIRST = ["Aarav", "Priya", "Rohan", "Sneha", "Vikram", "Ananya", "Karan", "Meera", "Arjun", "Isha"]
+LAST  = ["Sharma", "Verma", "Iyer", "Khan", "Patel", "Reddy", "Das", "Nair", "Gupta", "Singh"]
+ROLES = ["Software Engineer", "Data Analyst", "Backend Developer", "ML Engineer", "DevOps Engineer"]
+VERBS = ["Built", "Developed", "Implemented", "Created", "Designed", "Optimized", "Led", "Migrated"]
+
+LINES_PER_PAGE = 48
+
+
+def resume_lines(seed: int, pages: int = 1) -> List[str]:
+    """Plain-text resume with every scored section, padded to roughly `pages` pages."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    skills = rng.sample(TECH_KEYWORDS, min(len(TECH_KEYWORDS), rng.randint(6, 18)))
+    lines = [
+        name,
+        rng.choice(ROLES),
+        f"Email: {name.lower().replace(' ', '.')}@example.com | Phone: +91 98{rng.randint(10000000, 99999999)}",
+        f"LinkedIn: linkedin.com/in/{name.lower().replace(' ', '')} | GitHub: github.com/{name.split()[0].lower()}",
+        rng.choice(LOCATIONS) if LOCATIONS else "Bengaluru",
+        "",
+        "SUMMARY",
+        f"Engineer with {rng.randint(1, 12)} years of experience building production systems.",
+        "",
+        "EDUCATION",
+        f"B.Tech in Computer Science, National Institute of Technology, CGPA {rng.uniform(6.5, 9.8):.1f}",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "WORK EXPERIENCE",
+    ]
+    for job in range(rng.randint(1, 4)):
+        lines.append(f"{rng.choice(ROLES)} at Company {job + 1} ({2015 + job} - {2016 + job})")
+        for _ in range(3):
+            lines.append(f"- {rng.choice(VERBS)} services in {rng.choice(skills)}, improving latency by {rng.randint(5, 60)}%")
+    # Pad with more experience bullets up to the requested length
+    while len(lines) + 8 < pages * LINES_PER_PAGE:
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(skills)} pipeline handling {rng.randint(1, 900)}k requests/day")
+    lines += ["", "PROJECTS"]
+    for p in range(rng.randint(1, 4)):
+        lines.append(f"- Project {p + 1}: {rng.choice(VERBS)} a {rng.choice(skills)} tool with {rng.choice(skills)}")
+    lines += ["", "ACHIEVEMENTS", f"- Certification in {rng.choice(skills)}; hackathon award {2018 + rng.randint(0, 6)}"]
+    return lines
+
+
+def _pdf_escape(line: str) -> str:
+    line = line.encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(lines: List[str]) -> bytes:
+    """Minimal multi-page PDF with a text layer (Helvetica 10pt, 48 lines per page)."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        text = "\n".join(f"({_pdf_escape(l)}) Tj T*" for l in page)
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td\n{text}\nET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref)
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % num + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for off in offsets:
+        out.write(b"%010d 00000 n \n" % off)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def render_docx(lines: List[str]) -> bytes:
+    import docx
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def render_txt(lines: List[str]) -> bytes:
+    return "\n".join(lines).encode("utf-8")
+
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx, "txt": render_txt}
+
+
+def make_resume(seed: int, fmt: str = "pdf", pages: int = 1) -> bytes:
+    return RENDERERS[fmt](resume_lines(seed, pages))
+
+
+def write_corpus(out_dir: str, count: int, formats=("pdf",), pages: int = 1, seed: int = 0) -> List[str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(out_dir, f"resume_{i:04d}.{fmt}")
+        with open(path, "wb") as f:
+            f.write(make_resume(seed + i, fmt, pages))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=25)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--formats", default="pdf,docx,txt")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = write_corpus(args.out, args.count, args.formats.split(","), args.pages, args.seed)
+    print(f"Wrote {len(paths)} resumes to {args.out}")
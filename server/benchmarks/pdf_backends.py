@@ -0,0 +1,97 @@
+"""
+RankSense AI — PDF backend benchmark
+Times every installed PDF extraction backend on synthetic resumes of several
+lengths (with and without the PDF_MAX_PAGES cutoff) and reports how far each
+backend's text and section scores drift from pdfplumber's. Output uses the
+benchmarks/run.py result format, so compare.py works on it too.
+
+    cd server
+    python -m benchmarks.pdf_backends --pages 1,2,10
+"""
+import os, json, random, difflib, argparse
+from datetime import datetime, timezone
+
+import registry
+import resume_parser
+from benchmarks.corpus import make_resume
+from benchmarks.run import measure, git_commit, RESULTS_DIR
+from resume_parser import PDF_BACKENDS, extract_text_from_pdf, analyze_text
+
+
+def available_backends() -> list:
+    names = []
+    for name in PDF_BACKENDS:
+        try:
+            registry.get(name)
+            names.append(name)
+        except Exception as e:
+            print(f"skipping {name}: {e}")
+    return names
+
+
+def section_scores(text: str) -> dict:
+    random.seed(0)   # score_section adds jitter; fix it so backends are comparable
+    return {s: d["score"] for s, d in analyze_text("bench.pdf", text)["sections"].items()}
+
+
+def bench(backends: list, page_counts: list, repeat: int) -> dict:
+    """Each backend with no page limit, then with PDF_MAX_PAGES (5 unless set)."""
+    configured = resume_parser.PDF_MAX_PAGES
+    max_pages = configured or 5
+    results = {}
+    for pages in page_counts:
+        data = make_resume(pages, "pdf", pages)
+        texts = {}
+        for limit in (0, max_pages):
+            resume_parser.PDF_MAX_PAGES = limit
+            for name in backends:
+                key = f"pdf_{name}_{pages}p{'_limited' if limit else ''}"
+                texts[key] = extract_text_from_pdf(data, backend=name)
+                results[key] = {**measure(lambda: extract_text_from_pdf(data, backend=name), repeat),
+                                "chars": len(texts[key])}
+
+        # Output differences against pdfplumber's full extraction
+        ref_text = texts.get(f"pdf_pdfplumber_{pages}p")
+        if ref_text is None:
+            continue
+        ref_scores = section_scores(ref_text)
+        for key, text in texts.items():
+            scores = section_scores(text)
+            results[key]["text_similarity"] = round(difflib.SequenceMatcher(
+                None, ref_text.split(), text.split(), autojunk=False).ratio(), 4)
+            results[key]["max_section_delta"] = round(max(abs(scores[s] - ref_scores[s]) for s in scores), 1)
+    resume_parser.PDF_MAX_PAGES = configured
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF extraction backends")
+    parser.add_argument("--pages", default="1,2,10", help="comma-separated page counts")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/pdf-<sha>.json)")
+    args = parser.parse_args()
+
+    backends = available_backends()
+    results = bench(backends, [int(p) for p in args.pages.split(",")], args.repeat)
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "backends": backends,
+        "params": vars(args),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"pdf-{commit['sha'][:12]}{'-dirty' if commit['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    width = max(len(name) for name in results)
+    for name, r in results.items():
+        print(f"{name:<{width}}  median {r['median_ms']:>9.2f} ms  chars {r['chars']:>7}  "
+              f"similarity {r.get('text_similarity', float('nan')):.3f}  max Δscore {r.get('max_section_delta', float('nan'))}")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main_cli()
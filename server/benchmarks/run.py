@@ -0,0 +1,182 @@
+"""
+RankSense AI — Benchmark runner
+Micro-benchmarks for each pipeline stage on the synthetic corpus, plus an
+optional end-to-end run of /analyze and /batches/{id} against a local Postgres
+(DATABASE_URL). Results are written as JSON tagged with the git commit, for
+benchmarks/compare.py.
+
+    cd server
+    python -m benchmarks.run                     # stages only, offline
+    python -m benchmarks.run --e2e --files 25    # + endpoints (needs Postgres)
+"""
+import os, sys, json, time, uuid, platform, argparse, statistics, subprocess
+from datetime import datetime, timezone
+from typing import Callable, Dict
+
+import numpy as np
+
+from benchmarks.corpus import make_resume, resume_lines
+from resume_parser import (extract_text, scan_text, analyze_text, compute_topsis, generate_insights,
+                           SECTION_WEIGHTS)
+from topsis import topsis, top_k
+from serialization import dumps, compact_sections, feedback_table
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Wall-clock stats (ms) over `repeat` calls after `warmup` untimed ones."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+    }
+
+
+def git_commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, timeout=10,
+                                  cwd=os.path.dirname(__file__)).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"sha": git("rev-parse", "HEAD") or "unknown", "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+# ── STAGES ───────────────────────────────────────────────────────────────────
+
+def bench_stages(repeat: int, pages: int) -> Dict[str, dict]:
+    results = {}
+    files = {fmt: make_resume(1, fmt, pages) for fmt in ("pdf", "docx", "txt")}
+    for fmt, data in files.items():
+        results[f"extract_{fmt}_{pages}p"] = {
+            **measure(lambda: extract_text(f"bench.{fmt}", data), repeat), "bytes": len(data)}
+
+    text = "\n".join(resume_lines(1, pages))
+    results[f"scan_text_{pages}p"] = measure(lambda: scan_text(text), repeat * 5)
+    results[f"analyze_text_{pages}p"] = measure(lambda: analyze_text("bench.pdf", text), repeat * 5)
+
+    parsed = [analyze_text(f"r{i}.txt", "\n".join(resume_lines(i, 1)), i) for i in range(200)]
+    results["insights_200"] = measure(lambda: [generate_insights(p["name"], p["sections"]) for p in parsed], repeat)
+
+    for n in (25, 1000):
+        rows = [{s: d["score"] for s, d in parsed[i % len(parsed)]["sections"].items()} for i in range(n)]
+        results[f"compute_topsis_{n}"] = measure(lambda: compute_topsis(rows), repeat)
+
+    rng = np.random.default_rng(0)
+    matrix = rng.uniform(0, 100, size=(100_000, len(SECTION_WEIGHTS)))
+    weights = list(SECTION_WEIGHTS.values())
+    results["topsis_engine_100k"] = measure(lambda: top_k(topsis(matrix, weights), 50), repeat)
+
+    payload = {"batch_id": 1, "candidates": [_candidate(p, i) for i, p in enumerate(parsed)]}
+    results["serialize_200"] = {**measure(lambda: dumps(payload), repeat * 5), "bytes": len(dumps(payload))}
+    # Compact ids are emitted while the payload is built, so only encoding is timed
+    used = set()
+    compact = {"batch_id": 1, "candidates": [_candidate(p, i, used) for i, p in enumerate(parsed)],
+               "feedbackTexts": feedback_table(used)}
+    results["serialize_200_compact"] = {**measure(lambda: dumps(compact), repeat * 5),
+                                        "bytes": len(dumps(compact))}
+    return results
+
+
+def _candidate(p: dict, i: int, feedback_ids: set = None) -> dict:
+    sections = p["sections"] if feedback_ids is None else compact_sections(p["sections"], feedback_ids)
+    return {"id": i, "name": p["name"], "role": p["role"], "email": p["email"], "total": p["total_score"],
+            "topsis": 0.5, "rank": i + 1, "grade": "B", "keywords": p["keywords"],
+            "sections": sections, "insights": p["insights"]}
+
+
+# ── END TO END ───────────────────────────────────────────────────────────────
+
+def bench_e2e(repeat: int, n_files: int, pages: int, fmt: str) -> Dict[str, dict]:
+    """Drives the app in-process through TestClient; uses the database in DATABASE_URL."""
+    from fastapi.testclient import TestClient
+    import main
+
+    results = {}
+    with TestClient(main.app) as client:
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        r = client.post("/auth/register", json={"name": "Bench", "email": email, "password": "benchmark"})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['token']}"}
+
+        seed = [0]
+
+        def upload(fresh: bool):
+            if fresh:
+                seed[0] += n_files
+            files = [("files", (f"resume_{i}.{fmt}", make_resume(seed[0] + i, fmt, pages)))
+                     for i in range(n_files)]
+            r = client.post("/analyze", headers=headers, files=files, data={"job_title": "Engineer"})
+            r.raise_for_status()
+            return r.json()["batch_id"]
+
+        results[f"analyze_{n_files}x{fmt}"] = measure(lambda: upload(True), repeat, warmup=0)
+        results[f"analyze_{n_files}x{fmt}_cached"] = measure(lambda: upload(False), repeat)
+
+        batch_id = upload(True)
+
+        def get_batch(etag=None):
+            r = client.get(f"/batches/{batch_id}", headers={**headers, **({"If-None-Match": etag} if etag else {})})
+            assert r.status_code in (200, 304), r.status_code
+            return r
+
+        def get_batch_cold():
+            main.batch_responses.invalidate(batch_id)
+            get_batch()
+
+        results["get_batch_cold"] = measure(get_batch_cold, repeat)
+        results["get_batch_cached"] = measure(get_batch, repeat * 5)
+        etag = get_batch().headers.get("etag")
+        results["get_batch_304"] = measure(lambda: get_batch(etag), repeat * 5)
+        results["list_batches"] = measure(lambda: client.get("/batches", headers=headers).raise_for_status(), repeat * 5)
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Run the RankSense benchmarks")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--e2e", action="store_true", help="also benchmark endpoints against DATABASE_URL")
+    parser.add_argument("--files", type=int, default=25, help="files per /analyze call (--e2e)")
+    parser.add_argument("--format", default="pdf", choices=("pdf", "docx", "txt"))
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<sha>.json)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = bench_stages(args.repeat, args.pages)
+    if args.e2e:
+        results.update(bench_e2e(args.repeat, args.files, args.pages, args.format))
+
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": vars(args),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit['sha'][:12]}{'-dirty' if commit['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    width = max(len(name) for name in results)
+    for name, r in results.items():
+        print(f"{name:<{width}}  median {r['median_ms']:>10.3f} ms   p95 {r['p95_ms']:>10.3f} ms")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main_cli()
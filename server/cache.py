@@ -0,0 +1,272 @@
+"""
+RankSense AI — In-process caches
+LRUCache is a small thread-safe, size-bounded LRU with hit/miss counters.
+ResumeCache stores extracted resume text and parsed fields keyed by the
+SHA-256 of the uploaded bytes (computed while streaming, see ingest.py),
+with an optional on-disk tier shared by workers.
+ResponseCache keeps serialized payloads of finished batches with their ETags.
+"""
+import os, json, time, hashlib, threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+load_dotenv()
+
+RESUME_CACHE_SIZE    = int(os.getenv("RESUME_CACHE_SIZE", 512))          # entries
+RESUME_CACHE_MB      = float(os.getenv("RESUME_CACHE_MB", 64))            # in-memory tier
+RESUME_CACHE_DIR     = os.getenv("RESUME_CACHE_DIR", "")                  # empty = no disk tier
+RESUME_CACHE_DISK_MB = float(os.getenv("RESUME_CACHE_DISK_MB", 512))
+DISK_RESCAN_S        = 60   # re-read the directory this often to see other workers' files
+
+BATCH_CACHE_SIZE  = int(os.getenv("BATCH_CACHE_SIZE", 256))     # entries
+BATCH_CACHE_MB    = float(os.getenv("BATCH_CACHE_MB", 64))
+BATCH_CACHE_TTL_S = float(os.getenv("BATCH_CACHE_TTL_S", 300))
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and (optionally) total size.
+    With `ttl` (seconds), entries also expire that long after being set.
+    """
+
+    def __init__(self, max_items: int, max_bytes: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None, ttl: Optional[float] = None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof or (lambda v: 0)
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()   # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[2] is not None and entry[2] <= time.monotonic():
+                del self._data[key]
+                self._bytes -= entry[1]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_items or
+                                  (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._data), "bytes": self._bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+class ResumeCache:
+    """
+    Two-tier cache of {"filename", "text", "fields"} keyed by content hash.
+    `fields` is the process_resume() output without the per-batch avatar color.
+    Async code uses aget()/aset(), which run the disk tier in the threadpool.
+    The disk tier keeps its own LRU index of file sizes, so a write does not
+    rescan the directory; the index is rebuilt every DISK_RESCAN_S to pick up
+    files written by other worker processes.
+    """
+
+    def __init__(self, max_items: int, max_mb: float, disk_dir: str = "", disk_mb: float = 0):
+        self.memory = LRUCache(max_items, int(max_mb * 1024 * 1024), sizeof=_entry_size)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = int(disk_mb * 1024 * 1024)
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()   # path -> size, least recent first
+        self._disk_bytes = 0
+        self._disk_scanned = 0.0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_rescan()
+
+    def get(self, digest: str) -> Optional[dict]:
+        entry = self.memory.get(digest)
+        if entry is not None or not self.disk_dir:
+            return entry
+        return self._disk_load(digest)
+
+    def set(self, digest: str, entry: dict):
+        self.memory.set(digest, entry)
+        if self.disk_dir:
+            self._disk_set(digest, entry)
+
+    async def aget(self, digest: str) -> Optional[dict]:
+        entry = self.memory.get(digest)
+        if entry is not None or not self.disk_dir:
+            return entry
+        return await run_in_threadpool(self._disk_load, digest)
+
+    async def aset(self, digest: str, entry: dict):
+        self.memory.set(digest, entry)
+        if self.disk_dir:
+            await run_in_threadpool(self._disk_set, digest, entry)
+
+    # ── disk tier ──
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _disk_load(self, digest: str) -> Optional[dict]:
+        entry = self._disk_get(digest)
+        if entry is not None:
+            self.disk_hits += 1
+            self.memory.set(digest, entry)
+        return entry
+
+    def _disk_get(self, digest: str) -> Optional[dict]:
+        path = self._path(digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+                size = f.tell()
+            os.utime(path)  # mtime doubles as last-access time for eviction
+        except (OSError, ValueError):
+            return None
+        with self._disk_lock:
+            self._disk_track(path, size)
+        return entry
+
+    def _disk_set(self, digest: str, entry: dict):
+        path = self._path(digest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+                size = f.tell()
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Resume cache write error: {e}")
+            return
+        with self._disk_lock:
+            if time.monotonic() - self._disk_scanned > DISK_RESCAN_S:
+                self._disk_rescan()
+            self._disk_track(path, size)
+            self._disk_evict()
+
+    def _disk_track(self, path: str, size: int):
+        """Record `path` as most recently used (caller holds _disk_lock)."""
+        self._disk_bytes += size - self._disk_index.pop(path, 0)
+        self._disk_index[path] = size
+
+    def _disk_rescan(self):
+        try:
+            files = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".json")]
+            stats = sorted((e.stat().st_mtime, e.path, e.stat().st_size) for e in files)
+        except OSError:
+            return
+        self._disk_index = OrderedDict((path, size) for _, path, size in stats)
+        self._disk_bytes = sum(self._disk_index.values())
+        self._disk_scanned = time.monotonic()
+
+    def _disk_evict(self):
+        while self._disk_index and self._disk_bytes > self.disk_max_bytes:
+            path, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        mem = self.memory.stats()
+        return {**mem, "disk_hits": self.disk_hits, "disk_bytes": self._disk_bytes,
+                "misses": mem["misses"] - self.disk_hits, "disk_enabled": bool(self.disk_dir)}
+
+
+def _entry_size(entry: dict) -> int:
+    return len(entry.get("text", "")) + len(json.dumps(entry.get("fields", {})))
+
+
+class ResponseCache:
+    """
+    Ready-to-send response bodies keyed by batch id, stored as (owner, version, body, etag).
+    `version` comes from the database row on every read (e.g. candidate_count),
+    so an entry written before a change made by another worker process is
+    never served. A key can hold several encodings (`variant`, e.g. compact);
+    invalidate() drops all. Readers take a generation() token before loading
+    from the database and pass it to set(); an invalidate() in between makes
+    that set() a no-op, so a read racing a write can never cache the pre-write payload.
+    """
+
+    def __init__(self, max_items: int, max_mb: float, ttl: Optional[float] = None):
+        self.memory = LRUCache(max_items, int(max_mb * 1024 * 1024), sizeof=lambda e: len(e[2]), ttl=ttl)
+        self._generations = {}
+        self._variants = set()
+        self._lock = threading.Lock()
+
+    def generation(self, key) -> int:
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def get(self, key, owner, version, variant=None) -> Optional[tuple]:
+        """(body, etag) if cached for this owner at this version."""
+        entry = self.memory.get((key, variant))
+        if entry is None or entry[0] != owner or entry[1] != version:
+            return None
+        return entry[2], entry[3]
+
+    def set(self, key, owner, version, body: bytes, generation: int, variant=None) -> str:
+        """Cache body unless the key was invalidated since `generation`; returns its ETag."""
+        etag = make_etag(body)
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._variants.add(variant)
+                self.memory.set((key, variant), (owner, version, body, etag))
+        return etag
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            for variant in self._variants:
+                self.memory.pop((key, variant))
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag: quoted content hash of the exact response bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+resume_cache = ResumeCache(RESUME_CACHE_SIZE, RESUME_CACHE_MB, RESUME_CACHE_DIR, RESUME_CACHE_DISK_MB)
+batch_responses = ResponseCache(BATCH_CACHE_SIZE, BATCH_CACHE_MB, BATCH_CACHE_TTL_S)
@@ -0,0 +1,168 @@
+"""
+RankSense AI — Upload ingestion
+UploadLimitMiddleware caps multipart request bodies at the batch limit before
+form parsing starts (Content-Length up front, received bytes for chunked
+bodies), so an oversized upload is cut off instead of being written to disk.
+Starlette's form parser then buffers each part; ingest_batch copies the parts
+in the threadpool, hashing them and applying the per-file and per-batch
+limits. Small files stay in memory; anything above SPOOL_THRESHOLD_KB is
+spooled to a named temp file, so parsers get a path instead of the bytes.
+"""
+import os, io, hashlib, tempfile
+from typing import BinaryIO, List, Optional, Union
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+load_dotenv()
+
+MAX_FILE_MB       = float(os.getenv("MAX_FILE_MB", 10))
+MAX_BATCH_MB      = float(os.getenv("MAX_BATCH_MB", 200))
+SPOOL_THRESHOLD_KB = int(os.getenv("SPOOL_THRESHOLD_KB", 1024))
+UPLOAD_SPOOL_DIR  = os.getenv("UPLOAD_SPOOL_DIR") or None   # None = system temp dir
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+FORM_OVERHEAD_MB  = 1   # multipart boundaries and text fields (job_desc) on top of the files
+
+
+class SpooledUpload:
+    """One ingested file: either an in-memory buffer or a temp file on disk."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.size = 0
+        self.digest = ""
+        self.path: Optional[str] = None
+        self._buffer: Optional[bytes] = None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """What a parser worker needs: the bytes, or the path of the spooled file."""
+        return self.path if self.path is not None else self._buffer
+
+    def open(self) -> BinaryIO:
+        if self.path is not None:
+            return open(self.path, "rb")
+        return io.BytesIO(self._buffer)   # shares the bytes buffer, no copy
+
+    def cleanup(self):
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self._buffer = None
+
+
+class UploadLimitMiddleware:
+    """Answers 413 for multipart bodies larger than the batch limit, before the form is parsed."""
+
+    def __init__(self, app, max_mb: float = MAX_BATCH_MB + FORM_OVERHEAD_MB):
+        self.app = app
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers") or []) if scope["type"] == "http" else {}
+        if not headers.get(b"content-type", b"").startswith(b"multipart/"):
+            return await self.app(scope, receive, send)
+
+        detail = {"detail": f"Batch exceeds {MAX_BATCH_MB:g} MB"}
+        try:
+            declared = int(headers.get(b"content-length", 0))
+        except ValueError:
+            declared = 0
+        if declared > self.max_bytes:
+            return await JSONResponse(detail, status_code=413)(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside request.form(); FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail=detail["detail"])
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def ingest_upload(file: UploadFile, batch_budget: int) -> SpooledUpload:
+    """Copy one parsed upload into a SpooledUpload; raises 413 past MAX_FILE_MB or `batch_budget` bytes."""
+    filename = file.filename or "upload"
+    try:
+        # Starlette knows the part size already: reject before copying anything
+        if file.size is not None and file.size > MAX_FILE_MB * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"{filename} exceeds {MAX_FILE_MB:g} MB")
+        if file.size is not None and file.size > batch_budget:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_MB:g} MB")
+        await file.seek(0)
+        # One threadpool call per file: the reads and temp-file writes stay off the event loop
+        return await run_in_threadpool(_spool, file.file, filename, batch_budget)
+    finally:
+        await file.close()
+
+
+def _spool(stream: BinaryIO, filename: str, batch_budget: int) -> SpooledUpload:
+    max_file = int(MAX_FILE_MB * 1024 * 1024)
+    threshold = SPOOL_THRESHOLD_KB * 1024
+    upload = SpooledUpload(filename)
+    hasher = hashlib.sha256()
+    memory = io.BytesIO()
+    spool = None
+    try:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            upload.size += len(chunk)
+            if upload.size > max_file:
+                raise HTTPException(status_code=413, detail=f"{upload.filename} exceeds {MAX_FILE_MB:g} MB")
+            if upload.size > batch_budget:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_MB:g} MB")
+            hasher.update(chunk)
+            if spool is None and upload.size > threshold:
+                spool = tempfile.NamedTemporaryFile(prefix="ranksense-", dir=UPLOAD_SPOOL_DIR, delete=False)
+                upload.path = spool.name
+                spool.write(memory.getbuffer())
+                memory = None
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                memory.write(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        upload.cleanup()
+        raise
+
+    if spool is not None:
+        spool.close()
+    else:
+        upload._buffer = memory.getvalue()
+    upload.digest = hasher.hexdigest()
+    return upload
+
+
+async def ingest_batch(files: List[UploadFile]) -> List[SpooledUpload]:
+    """Ingest every upload in order, enforcing MAX_BATCH_MB across the batch."""
+    budget = int(MAX_BATCH_MB * 1024 * 1024)
+    uploads: List[SpooledUpload] = []
+    try:
+        for file in files:
+            upload = await ingest_upload(file, budget)
+            budget -= upload.size
+            uploads.append(upload)
+    except BaseException:
+        cleanup(uploads)
+        raise
+    return uploads
+
+
+def cleanup(uploads: List[SpooledUpload]):
+    for upload in uploads:
+        upload.cleanup()
@@ -0,0 +1,132 @@
+"""
+RankSense AI — Background batch jobs
+Async /analyze mode: the batch is processed by a bounded pool of background
+tasks while clients poll /batches/{id}/status or follow /batches/{id}/events.
+"""
+import os, asyncio, time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_WORKERS     = int(os.getenv("JOB_WORKERS", 2))
+JOB_RETENTION_S = int(os.getenv("JOB_RETENTION_S", 3600))
+
+QUEUED, PROCESSING, DONE, FAILED = "queued", "processing", "done", "failed"
+
+
+class BatchJob:
+    """In-memory progress for one batch, owned by the worker that accepted it."""
+
+    def __init__(self, batch_id: int, filenames: List[str]):
+        self.batch_id = batch_id
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.files = [{"filename": f, "status": QUEUED} for f in filenames]
+        self.updated_at = time.time()
+        self.version = 0                  # bumped on every change; subscribers compare against it
+        self._changed = asyncio.Event()
+
+    def set_file(self, idx: int, status: str):
+        self.files[idx]["status"] = status
+        self._touch()
+
+    def set_status(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self._touch()
+
+    def _touch(self):
+        self.updated_at = time.time()
+        self.version += 1
+        # Wake everyone waiting on this change; later waiters get a fresh event,
+        # so no subscriber can clear a change another one has not seen yet
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_changed(self, since: int, timeout: float) -> int:
+        """Wait until `version` moves past `since` (or `timeout`); returns the current version."""
+        if self.version == since:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.version
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self) -> dict:
+        processed = sum(1 for f in self.files if f["status"] in (DONE, FAILED))
+        return {
+            "batch_id": self.batch_id,
+            "status": self.status,
+            "total": len(self.files),
+            "processed": processed,
+            "progress": round(processed / max(len(self.files), 1), 4),
+            "files": [dict(f) for f in self.files],
+            "error": self.error,
+        }
+
+
+_jobs: Dict[int, BatchJob] = {}
+_tasks: set = set()
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_job(batch_id: int) -> Optional[BatchJob]:
+    return _jobs.get(batch_id)
+
+
+def submit(batch_id: int, filenames: List[str],
+           runner: Callable[[BatchJob], Awaitable[None]],
+           on_cancel: Optional[Callable[[BatchJob], Awaitable[None]]] = None) -> BatchJob:
+    """
+    Register a job and schedule `runner(job)` once a worker slot is free.
+    `on_cancel(job)` runs if the job is cancelled (shutdown) before the runner starts;
+    a runner that was already started must clean up after CancelledError itself.
+    """
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(JOB_WORKERS)
+    _evict_finished()
+
+    job = BatchJob(batch_id, filenames)
+    _jobs[batch_id] = job
+
+    async def _run():
+        started = False
+        try:
+            async with _slots:
+                started = True
+                job.set_status(PROCESSING)
+                await runner(job)
+                job.set_status(DONE)
+        except asyncio.CancelledError:
+            # Server shutting down (shutdown_jobs)
+            job.set_status(FAILED, "Cancelled by server shutdown")
+            if not started and on_cancel:
+                await on_cancel(job)
+            raise
+        except Exception as e:
+            print(f"Batch {batch_id} failed: {e}")
+            job.set_status(FAILED, str(e))
+
+    task = asyncio.create_task(_run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def shutdown_jobs():
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+
+
+def _evict_finished():
+    cutoff = time.time() - JOB_RETENTION_S
+    for batch_id in [b for b, j in _jobs.items() if j.finished and j.updated_at < cutoff]:
+        del _jobs[batch_id]
@@ -2,17 +2,34 @@
 RankSense AI — FastAPI main application
 PostgreSQL backend with JWT auth + resume analysis
 """
-import os
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, status
+import os, json, time, base64, asyncio, threading
+import psycopg2.errors, psycopg2.extras
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Dict, Optional, List, Union
+from datetime import datetime
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 
-from database import get_conn, init_db
-from auth import hash_password, verify_password, create_access_token, decode_token
-from resume_parser import process_resume, compute_topsis
+from database import (get_cursor, connection, init_db, close_pool, pool_stats, PoolTimeout,
+                      insert_ranked_candidates, iter_section_matrix)
+from auth import (hash_password_async, verify_password_async, needs_rehash,
+                  create_access_token, decode_token, user_token_claims, user_from_claims,
+                  shutdown_hashing, HashingBusy, USER_CACHE_TTL_S)
+from resume_parser import compute_topsis, get_grade, feedback_id, SECTION_WEIGHTS, TECH_KEYWORDS, LOCATIONS
+from relevance import score_relevance, RELEVANCE_WEIGHT
+import registry
+from pipeline import process_batch, shutdown_pool, warm_pool
+from cache import resume_cache, batch_responses, make_etag, LRUCache
+from metrics import BatchTimings
+import metrics
+from serialization import dumps, compact_sections, feedback_table, FastJSONResponse
+from ingest import ingest_batch, cleanup as cleanup_uploads, UploadLimitMiddleware
+from jobs import submit as submit_job, get_job, shutdown_jobs
+from ocr import shutdown_ocr
 
 load_dotenv()
 
@@ -20,6 +37,9 @@ load_dotenv()
 
 app = FastAPI(title="RankSense AI API", version="2.0.0")
 
+# Inside CORS, so a 413 still carries the CORS headers
+app.add_middleware(UploadLimitMiddleware)
+
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -35,9 +56,42 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 @app.on_event("startup")
 def startup():
     init_db()
+    if registry.WARMUP_MODE == "eager":
+        # Warm up in the background; /ready answers 503 until it finishes
+        threading.Thread(target=_warm_up, daemon=True).start()
     print("🚀 RankSense AI API started")
 
 
+def _warm_up():
+    start = time.perf_counter()
+    # Start the parser workers before this process loads the relevance model
+    warm_pool()
+    registry.warm_up()
+    registry.mark_ready()
+    print(f"🔥 Warm-up finished in {time.perf_counter() - start:.1f}s")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await shutdown_jobs()
+    shutdown_pool()
+    shutdown_ocr()   # OCR threads of the in-process parser (EXTRACT_WORKERS=0)
+    shutdown_hashing()
+    close_pool()
+
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request, exc: PoolTimeout):
+    return JSONResponse(status_code=503, content={"detail": "Database busy, retry shortly"},
+                        headers={"Retry-After": "1"})
+
+
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request, exc: HashingBusy):
+    return JSONResponse(status_code=503, content={"detail": "Too many sign-in attempts, retry shortly"},
+                        headers={"Retry-After": "2"})
+
+
 # ── AUTH ──────────────────────────────────────────────────────────────────────
 
 class RegisterRequest(BaseModel):
@@ -51,6 +105,9 @@ class LoginRequest(BaseModel):
     password: str
 
 
+_user_cache = LRUCache(int(os.getenv("USER_CACHE_SIZE", 10000)), ttl=USER_CACHE_TTL_S)
+
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
     payload = decode_token(token)
     if not payload:
@@ -58,37 +115,84 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, name, email, plan, created_at FROM users WHERE id = %s", (user_id,))
-    user = cur.fetchone()
-    cur.close(); conn.close()
+
+    # Stateless tokens carry everything the endpoints need
+    user = user_from_claims(payload)
+    if user:
+        return user
+
+    if USER_CACHE_TTL_S > 0:
+        user = _user_cache.get(str(user_id))
+        if user:
+            return dict(user)
+    with get_cursor() as cur:
+        cur.execute("SELECT id, name, email, plan, created_at FROM users WHERE id = %s", (user_id,))
+        user = cur.fetchone()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    user = dict(user)
+    if USER_CACHE_TTL_S > 0:
+        _user_cache.set(str(user_id), user)
     return dict(user)
 
 
+def invalidate_user(user_id: int):
+    """Drop a cached user; every write to a users row must call this."""
+    _user_cache.pop(str(user_id))
+
+
+def _find_user(email: str, columns: str = "id"):
+    with get_cursor() as cur:
+        cur.execute(f"SELECT {columns} FROM users WHERE email = %s", (email,))
+        row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def _insert_user(name: str, email: str, hashed: str) -> dict:
+    with get_cursor() as cur:
+        cur.execute(
+            "INSERT INTO users (name, email, password) VALUES (%s, %s, %s) RETURNING id, name, email, plan, created_at",
+            (name, email, hashed)
+        )
+        return dict(cur.fetchone())
+
+
+def _update_password(user_id: int, old_hash: str, new_hash: str):
+    with get_cursor() as cur:
+        # Compare-and-set so a concurrent password change is never overwritten
+        cur.execute("UPDATE users SET password = %s WHERE id = %s AND password = %s",
+                    (new_hash, user_id, old_hash))
+    invalidate_user(user_id)
+
+
+_rehash_tasks = set()
+
+
+async def _rehash_password(user_id: int, password: str, old_hash: str):
+    try:
+        new_hash = await hash_password_async(password)
+        await run_in_threadpool(_update_password, user_id, old_hash, new_hash)
+    except HashingBusy:
+        pass  # retried on the next login
+    except Exception as e:
+        print(f"Password rehash failed for user {user_id}: {e}")
+
+
 @app.post("/auth/register", status_code=201)
-def register(body: RegisterRequest):
+async def register(body: RegisterRequest):
     if len(body.password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute("SELECT id FROM users WHERE email = %s", (body.email,))
-    if cur.fetchone():
-        cur.close(); conn.close()
+    if await run_in_threadpool(_find_user, body.email):
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    hashed = hash_password(body.password)
-    cur.execute(
-        "INSERT INTO users (name, email, password) VALUES (%s, %s, %s) RETURNING id, name, email, plan, created_at",
-        (body.name, body.email, hashed)
-    )
-    user = dict(cur.fetchone())
-    conn.commit(); cur.close(); conn.close()
+    # Hash on the bcrypt pool, without holding a pooled connection
+    hashed = await hash_password_async(body.password)
+    try:
+        user = await run_in_threadpool(_insert_user, body.name, body.email, hashed)
+    except psycopg2.errors.UniqueViolation:
+        raise HTTPException(status_code=409, detail="Email already registered")
 
-    token = create_access_token({"sub": str(user["id"])})
+    token = create_access_token(user_token_claims(user))
     return {
         "token": token,
         "user": {
@@ -103,18 +207,17 @@ def register(body: RegisterRequest):
 
 
 @app.post("/auth/login")
-def login(body: LoginRequest):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id, name, email, password, plan, created_at FROM users WHERE email = %s", (body.email,))
-    user = cur.fetchone()
-    cur.close(); conn.close()
-
-    if not user or not verify_password(body.password, user["password"]):
+async def login(body: LoginRequest):
+    user = await run_in_threadpool(_find_user, body.email, "id, name, email, password, plan, created_at")
+    if not user or not await verify_password_async(body.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    user = dict(user)
-    token = create_access_token({"sub": str(user["id"])})
+    if needs_rehash(user["password"]):
+        # Upgrade the cost factor in the background; the login response does not wait for it
+        task = asyncio.create_task(_rehash_password(user["id"], body.password, user["password"]))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+    token = create_access_token(user_token_claims(user))
     return {
         "token": token,
         "user": {
@@ -143,195 +246,771 @@ def get_me(current_user: dict = Depends(get_current_user)):
 
 # ── RESUME UPLOAD & ANALYSIS ─────────────────────────────────────────────────
 
-@app.post("/analyze")
+# Response models document the ranking payloads in /docs. The endpoints return
+# pre-serialized responses, so FastAPI does not re-validate them per request.
+class SectionOut(BaseModel):
+    score: float
+    weight: float
+    level: str
+    feedback: Union[str, int]          # key into feedbackTexts when compact=true
+
+
+class InsightOut(BaseModel):
+    type: str
+    text: str
+
+
+class CandidateOut(BaseModel):
+    id: int
+    name: str
+    role: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    education: Optional[str] = None
+    experience: Optional[str] = None
+    location: Optional[str] = None
+    total: float
+    topsis: float
+    relevance: Optional[float] = None
+    rank: int
+    grade: str
+    gradeColor: str
+    avatar: str
+    color: str
+    keywords: List[str] = []
+    sections: Dict[str, SectionOut]
+    insights: List[InsightOut]
+
+
+class BatchOut(BaseModel):
+    batch_id: int
+    count: Optional[int] = None
+    candidates: List[CandidateOut]
+    feedbackTexts: Optional[Dict[str, str]] = None
+
+
+MAX_FILES_SYNC  = 25
+MAX_FILES_ASYNC = int(os.getenv("MAX_FILES_ASYNC", 200))
+
+
+@app.post("/analyze", responses={200: {"model": BatchOut}})
 async def analyze_resumes(
+    response: Response,
     files: List[UploadFile] = File(...),
     job_title: Optional[str] = Form(None),
     job_desc: Optional[str] = Form(None),
+    mode: str = Form("sync"),
+    compact: bool = Form(False),
     current_user: dict = Depends(get_current_user),
 ):
+    if mode not in ("sync", "async"):
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'async'")
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
-    if len(files) > 25:
-        raise HTTPException(status_code=400, detail="Maximum 25 files per batch")
+    max_files = MAX_FILES_ASYNC if mode == "async" else MAX_FILES_SYNC
+    if len(files) > max_files:
+        raise HTTPException(status_code=400, detail=f"Maximum {max_files} files per batch")
+
+    timings = BatchTimings()
+    # Copy the parsed uploads to memory/temp files up front (the body size was
+    # capped by UploadLimitMiddleware); the UploadFiles are closed here
+    with timings.stage("ingest"):
+        uploads = await ingest_batch(files)
 
     # Create batch
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO batches (user_id, job_title, job_desc, status) VALUES (%s, %s, %s, 'processing') RETURNING id",
-        (current_user["id"], job_title, job_desc)
-    )
-    batch_id = cur.fetchone()["id"]
-    conn.commit()
-
-    # Process each resume
-    parsed = []
-    for idx, file in enumerate(files):
-        content = await file.read()
-        result = process_resume(file.filename, content, color_idx=idx)
-        result["batch_id"] = batch_id
-        result["color_idx"] = idx
-        parsed.append(result)
+    try:
+        batch_id = await run_in_threadpool(_create_batch, current_user["id"], job_title, job_desc)
+    except Exception:
+        cleanup_uploads(uploads)
+        raise
+
+    if mode == "async":
+        async def runner(job):
+            try:
+                with timings.stage("parse"):
+                    parsed = await process_batch(uploads, on_file_done=lambda i: job.set_file(i, "done"),
+                                                 timings=timings)
+                await run_in_threadpool(_rank_and_store, batch_id, parsed, job_desc, timings)
+            except (Exception, asyncio.CancelledError):
+                # CancelledError (shutdown_jobs) too, or the row stays 'processing' forever
+                await run_in_threadpool(_mark_batch_failed, batch_id)
+                raise
+            finally:
+                cleanup_uploads(uploads)
+
+        async def on_cancel(job):
+            cleanup_uploads(uploads)
+            await run_in_threadpool(_mark_batch_failed, batch_id)
+
+        job = submit_job(batch_id, [u.filename for u in uploads], runner, on_cancel)
+        response.status_code = 202
+        return job.snapshot()
+
+    # Process resumes in the extraction pool (order and color_idx preserved)
+    try:
+        with timings.stage("parse"):
+            parsed = await process_batch(uploads, timings=timings)
+        await run_in_threadpool(_rank_and_store, batch_id, parsed, job_desc, timings)
+    except Exception:
+        await run_in_threadpool(_mark_batch_failed, batch_id)
+        raise
+    finally:
+        cleanup_uploads(uploads)
+
+    feedback_ids = set() if compact else None
+    payload = {
+        "batch_id": batch_id,
+        "count": len(parsed),
+        "candidates": [_format_candidate(p, feedback_ids) for p in parsed],
+    }
+    if compact:
+        payload["feedbackTexts"] = feedback_table(feedback_ids)
+    # Built from our own dicts: encode directly, skipping jsonable_encoder
+    return FastJSONResponse(payload)
+
+
+def _rank_and_store(batch_id: int, parsed: list, job_desc: Optional[str] = None,
+                    timings: Optional[BatchTimings] = None):
+    """Rank parsed resumes with TOPSIS (sorting `parsed` in place) and persist them."""
+    timings = timings or BatchTimings()
+    for p in parsed:
+        p["batch_id"] = batch_id
+
+    # Relevance to the job description (None without a JD or model)
+    with timings.stage("relevance"):
+        relevance = score_relevance(job_desc, [p.get("text", "") for p in parsed])
+    for i, p in enumerate(parsed):
+        p["relevance"] = relevance[i] if relevance else None
 
     # Compute TOPSIS ranking
-    sections_list = [p["sections"] for p in parsed]
-    section_scores_list = [{s: d["score"] for s, d in secs.items()} for secs in sections_list]
-    topsis_scores = compute_topsis(section_scores_list)
+    with timings.stage("rank"):
+        section_scores_list = [{s: d["score"] for s, d in p["sections"].items()} for p in parsed]
+        topsis_scores = _topsis(section_scores_list, [p["relevance"] for p in parsed])
 
     # Rank candidates
     for i, p in enumerate(parsed):
         p["topsis_score"] = round(topsis_scores[i] if topsis_scores else 0.5, 4)
 
     parsed.sort(key=lambda x: x["topsis_score"], reverse=True)
-
-    # Save to DB
-    candidate_ids = []
     for rank_pos, p in enumerate(parsed, start=1):
+        p["rank"] = rank_pos
+
+    # Save to DB in a single transaction
+    with get_cursor() as cur:
+        with timings.stage("persist"):
+            candidate_ids = insert_ranked_candidates(cur, batch_id, parsed)
+        cur.execute("UPDATE batches SET status = 'done', candidate_count = %s, timings = %s WHERE id = %s",
+                    (len(parsed), psycopg2.extras.Json(timings.as_dict()), batch_id))
+
+    for cand_id, p in zip(candidate_ids, parsed):
+        p["db_id"] = cand_id
+
+
+def _topsis(section_scores_list: list, relevance: list) -> list:
+    """TOPSIS over the section scores, plus Relevance when every candidate has one."""
+    weights = None
+    if relevance and all(r is not None for r in relevance):
+        section_scores_list = [{**scores, "Relevance": r} for scores, r in zip(section_scores_list, relevance)]
+        weights = {**SECTION_WEIGHTS, "Relevance": RELEVANCE_WEIGHT}
+    return compute_topsis(section_scores_list, weights)
+
+
+def _create_batch(user_id: int, job_title: Optional[str], job_desc: Optional[str]) -> int:
+    with get_cursor() as cur:
+        cur.execute(
+            "INSERT INTO batches (user_id, job_title, job_desc, status) VALUES (%s, %s, %s, 'processing') RETURNING id",
+            (user_id, job_title, job_desc)
+        )
+        return cur.fetchone()["id"]
+
+
+def _mark_batch_failed(batch_id: int):
+    with get_cursor() as cur:
+        cur.execute("UPDATE batches SET status = 'failed' WHERE id = %s", (batch_id,))
+
+
+# ── INCREMENTAL RE-RANKING ────────────────────────────────────────────────────
+
+@app.post("/batches/{batch_id}/candidates")
+async def add_candidates(
+    batch_id: int,
+    files: List[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Append resumes to a finished batch. Only the new files are parsed; current
+    candidates are re-ranked from their stored section scores.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+    if len(files) > MAX_FILES_SYNC:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_FILES_SYNC} files per request")
+
+    batch = await run_in_threadpool(_get_owned_batch, batch_id, current_user["id"])
+    if batch["status"] == "failed":
+        raise HTTPException(status_code=409, detail="Batch failed; upload these resumes as a new batch")
+    if batch["status"] != "done":
+        raise HTTPException(status_code=409, detail="Batch is still processing")
+
+    timings = BatchTimings()
+    with timings.stage("ingest"):
+        uploads = await ingest_batch(files)
+    try:
+        with timings.stage("parse"):
+            parsed = await process_batch(uploads, color_offset=batch["candidate_count"], timings=timings)
+    finally:
+        cleanup_uploads(uploads)
+
+    return await run_in_threadpool(_append_and_rerank, batch_id, parsed, batch["job_desc"], timings)
+
+
+def _append_and_rerank(batch_id: int, parsed: list, job_desc: Optional[str] = None,
+                       timings: Optional[BatchTimings] = None) -> dict:
+    timings = timings or BatchTimings()
+    # Relevance runs the embedding model: do it before taking a connection and the row lock
+    with timings.stage("relevance"):
+        relevance = score_relevance(job_desc, [p.get("text", "") for p in parsed]) if job_desc else None
+    for i, p in enumerate(parsed):
+        p["batch_id"] = batch_id
+        p["relevance"] = relevance[i] if relevance else None
+
+    with get_cursor() as cur:
+        # Serialize concurrent appends to the same batch
+        cur.execute("SELECT id FROM batches WHERE id = %s FOR UPDATE", (batch_id,))
+
         cur.execute("""
-            INSERT INTO candidates
-              (batch_id, name, role, email, phone, education, experience, location,
-               total_score, topsis_score, grade, grade_color, rank_position,
-               avatar, avatar_color, keywords)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            RETURNING id
-        """, (
-            batch_id, p["name"], p["role"], p["email"], p["phone"],
-            p["education"], p["experience"], p["location"],
-            p["total_score"], p["topsis_score"], p["grade"], p["grade_color"],
-            rank_pos, p["avatar"], p["avatar_color"], p["keywords"]
-        ))
-        cand_id = cur.fetchone()["id"]
-        candidate_ids.append(cand_id)
-        p["db_id"]      = cand_id
-        p["rank"]       = rank_pos
-
-        # Sections
-        for sec_name, sec_data in p["sections"].items():
-            cur.execute("""
-                INSERT INTO sections (candidate_id, section_name, score, weight, level, feedback)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (cand_id, sec_name, sec_data["score"], sec_data["weight"],
-                  sec_data["level"], sec_data["feedback"]))
-
-        # Insights
-        for ins in p["insights"]:
-            cur.execute(
-                "INSERT INTO insights (candidate_id, type, text) VALUES (%s, %s, %s)",
-                (cand_id, ins["type"], ins["text"])
-            )
-
-    cur.execute("UPDATE batches SET status = 'done' WHERE id = %s", (batch_id,))
-    conn.commit(); cur.close(); conn.close()
+            SELECT c.id, c.rank_position, c.topsis_score, c.relevance,
+                   json_object_agg(s.section_name, s.score) AS scores
+            FROM candidates c
+            JOIN sections s ON s.candidate_id = c.id
+            WHERE c.batch_id = %s
+            GROUP BY c.id
+        """, (batch_id,))
+        existing = cur.fetchall()
+
+        with timings.stage("rank"):
+            section_scores_list = [dict(e["scores"]) for e in existing] + \
+                                  [{s: d["score"] for s, d in p["sections"].items()} for p in parsed]
+            topsis_scores = _topsis(section_scores_list,
+                                    [e["relevance"] for e in existing] + [p["relevance"] for p in parsed])
+
+        # Rank old and new rows together; existing rows are ("old", row), new ones ("new", parsed)
+        pool = [("old", e) for e in existing] + [("new", p) for p in parsed]
+        scored = sorted(zip(topsis_scores, range(len(pool))), key=lambda x: x[0], reverse=True)
+
+        updates = []
+        for rank_pos, (score, i) in enumerate(scored, start=1):
+            kind, row = pool[i]
+            score = round(score, 4)
+            if kind == "new":
+                row["topsis_score"], row["rank"] = score, rank_pos
+            elif row["rank_position"] != rank_pos or round(row["topsis_score"], 4) != score:
+                updates.append((row["id"], rank_pos, score))
+
+        with timings.stage("persist"):
+            candidate_ids = insert_ranked_candidates(cur, batch_id, parsed)
+            if updates:
+                psycopg2.extras.execute_values(cur, """
+                    UPDATE candidates AS c
+                    SET rank_position = v.rank_position, topsis_score = v.topsis_score
+                    FROM (VALUES %s) AS v(id, rank_position, topsis_score)
+                    WHERE c.id = v.id
+                """, updates, page_size=len(updates))
+        cur.execute("UPDATE batches SET candidate_count = candidate_count + %s, timings = %s WHERE id = %s",
+                    (len(parsed), psycopg2.extras.Json(timings.as_dict()), batch_id))
+
+        for cand_id, p in zip(candidate_ids, parsed):
+            p["db_id"] = cand_id
 
+        result = _load_batch_candidates(cur, batch_id)
+
+    batch_responses.invalidate(batch_id)
     return {
         "batch_id": batch_id,
-        "count": len(parsed),
-        "candidates": [_format_candidate(p) for p in parsed],
+        "added": len(parsed),
+        "reranked": len(updates),
+        "candidates": result,
+    }
+
+
+# ── TALENT POOL RANKING ───────────────────────────────────────────────────────
+
+TOPSIS_CHUNK_ROWS = int(os.getenv("TOPSIS_CHUNK_ROWS", 50000))
+
+
+@app.get("/candidates/top")
+def top_candidates(k: int = Query(50, ge=1, le=1000), current_user: dict = Depends(get_current_user)):
+    """
+    Rank every candidate across all of the user's batches by their stored section
+    scores (streaming two-pass TOPSIS) and return the top k.
+    """
+    from topsis import StreamingTopsis   # imports numpy: keep it off the startup path
+
+    names = sorted(SECTION_WEIGHTS)
+    engine = StreamingTopsis([SECTION_WEIGHTS[s] / 100 for s in names])
+    with connection() as conn:
+        ids, scores, total = engine.rank(
+            lambda: iter_section_matrix(conn, current_user["id"], names, TOPSIS_CHUNK_ROWS), k)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT id, batch_id, name, role, location, total_score, grade, grade_color,
+                   avatar, avatar_color, keywords
+            FROM candidates WHERE id = ANY(%s)
+        """, (ids.tolist(),))
+        by_id = {r["id"]: r for r in cur.fetchall()}
+        cur.close()
+
+    return {
+        "pool_size": total,
+        "candidates": [{
+            "id": cid,
+            "batch_id": by_id[cid]["batch_id"],
+            "name": by_id[cid]["name"],
+            "role": by_id[cid]["role"],
+            "location": by_id[cid]["location"],
+            "total": float(by_id[cid]["total_score"]),
+            "topsis": round(float(score), 4),
+            "rank": rank_pos,
+            "grade": by_id[cid]["grade"],
+            "gradeColor": by_id[cid]["grade_color"],
+            "avatar": by_id[cid]["avatar"],
+            "color": by_id[cid]["avatar_color"],
+            "keywords": by_id[cid]["keywords"] or [],
+        } for rank_pos, (cid, score) in enumerate(zip(ids.tolist(), scores), start=1) if cid in by_id],
+    }
+
+
+# ── CANDIDATE SEARCH ──────────────────────────────────────────────────────────
+
+_KEYWORD_CASE  = {kw.lower(): kw for kw in TECH_KEYWORDS}
+_LOCATION_CASE = {loc.lower(): loc for loc in LOCATIONS}
+
+
+@app.get("/candidates/search")
+def search_candidates(
+    keywords: List[str] = Query([]),
+    location: Optional[str] = None,
+    grade: List[str] = Query([]),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Search candidates across all of the user's batches, best total score first.
+    Every keyword must be present. Pass `next_cursor` back as `cursor` for the next page.
+    """
+    where = ["user_id = %s"]
+    params: list = [current_user["id"]]
+    if keywords:
+        where.append("keywords @> %s::text[]")
+        params.append([_KEYWORD_CASE.get(k.strip().lower(), k.strip()) for k in keywords])
+    if location:
+        where.append("location = %s")
+        params.append(_LOCATION_CASE.get(location.strip().lower(), location.strip()))
+    if grade:
+        where.append("grade = ANY(%s)")
+        params.append(grade)
+    if min_score is not None:
+        where.append("total_score >= %s")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("total_score <= %s")
+        params.append(max_score)
+    if cursor:
+        after_score, after_id = _decode_cursor(cursor, 2)
+        try:
+            params += [float(after_score), int(after_id)]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where.append("(total_score, id) < (%s, %s)")
+
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT id, batch_id, name, role, email, education, experience, location,
+                   total_score, topsis_score, grade, grade_color, avatar, avatar_color, keywords
+            FROM candidates
+            WHERE {" AND ".join(where)}
+            ORDER BY total_score DESC, id DESC
+            LIMIT %s
+        """, params + [limit + 1])
+        rows = cur.fetchall()
+
+    page, more = rows[:limit], len(rows) > limit
+    return {
+        "candidates": [{
+            "id": r["id"],
+            "batch_id": r["batch_id"],
+            "name": r["name"],
+            "role": r["role"],
+            "email": r["email"],
+            "education": r["education"],
+            "experience": r["experience"],
+            "location": r["location"],
+            "total": float(r["total_score"]),
+            "topsis": float(r["topsis_score"]),
+            "grade": r["grade"],
+            "gradeColor": r["grade_color"],
+            "avatar": r["avatar"],
+            "color": r["avatar_color"],
+            "keywords": r["keywords"] or [],
+        } for r in page],
+        "next_cursor": _encode_cursor([page[-1]["total_score"], page[-1]["id"]]) if more else None,
+    }
+
+
+# ── RE-RANKING WITH CUSTOM WEIGHTS ────────────────────────────────────────────
+
+class RerankRequest(BaseModel):
+    weights: Dict[str, float] = {}        # section -> weight; missing sections keep SECTION_WEIGHTS
+    cost: List[str] = []                  # criteria where lower is better (default: all benefit)
+    relevance_weight: Optional[float] = None
+
+
+@app.post("/batches/{batch_id}/rerank")
+def rerank_batch(batch_id: int, body: RerankRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Recompute totals and TOPSIS from the stored section scores with per-request
+    weights. Nothing is re-parsed or persisted; the new ordering is returned.
+    """
+    names = sorted(SECTION_WEIGHTS)
+    criteria = names + ["Relevance"]
+    unknown = (set(body.weights) | set(body.cost)) - set(criteria)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown criteria: {', '.join(sorted(unknown))}")
+    if any(w < 0 for w in body.weights.values()):
+        raise HTTPException(status_code=400, detail="Weights must be non-negative")
+
+    section_weights = [float(body.weights.get(s, SECTION_WEIGHTS[s])) for s in names]
+    if sum(section_weights) <= 0:
+        raise HTTPException(status_code=400, detail="At least one section weight must be positive")
+
+    with get_cursor() as cur:
+        cur.execute("SELECT id FROM batches WHERE id = %s AND user_id = %s", (batch_id, current_user["id"]))
+        if not cur.fetchone():
+            raise HTTPException(status_code=404, detail="Batch not found")
+        cur.execute("""
+            SELECT c.id, c.name, c.avatar, c.avatar_color, c.rank_position, c.relevance,
+                   array_agg(s.score ORDER BY s.section_name COLLATE "C") AS scores
+            FROM candidates c
+            JOIN sections s ON s.candidate_id = c.id
+            WHERE c.batch_id = %s AND s.section_name = ANY(%s)
+            GROUP BY c.id
+            HAVING COUNT(*) = %s
+        """, (batch_id, names, len(names)))
+        rows = cur.fetchall()
+
+    if not rows:
+        return {"batch_id": batch_id, "candidates": []}
+
+    np = registry.get("numpy")
+    from topsis import topsis, rank_order
+
+    matrix = np.array([r["scores"] for r in rows], dtype=np.float64)
+    w = np.array(section_weights)
+    totals = matrix @ (w / w.sum())
+
+    weights = section_weights
+    relevance_weight = body.weights.get("Relevance", body.relevance_weight)
+    relevance_weight = RELEVANCE_WEIGHT if relevance_weight is None else relevance_weight
+    if relevance_weight > 0 and all(r["relevance"] is not None for r in rows):
+        matrix = np.column_stack([matrix, [r["relevance"] for r in rows]])
+        weights = section_weights + [relevance_weight]
+    used = criteria[:len(weights)]
+    scores = topsis(matrix, weights, benefit=[c not in body.cost for c in used], inplace=True)
+
+    order = rank_order(scores)
+    result = []
+    for rank_pos, i in enumerate(order.tolist(), start=1):
+        r = rows[i]
+        total = round(float(totals[i]), 1)
+        grade, grade_color = get_grade(total)
+        result.append({
+            "id": r["id"],
+            "name": r["name"],
+            "avatar": r["avatar"],
+            "color": r["avatar_color"],
+            "total": total,
+            "topsis": round(float(scores[i]), 4),
+            "rank": rank_pos,
+            "previousRank": r["rank_position"],
+            "grade": grade,
+            "gradeColor": grade_color,
+        })
+    return {
+        "batch_id": batch_id,
+        "weights": dict(zip(used, weights)),
+        "cost": [c for c in body.cost if c in used],
+        "candidates": result,
     }
 
 
 # ── RESULTS RETRIEVAL ─────────────────────────────────────────────────────────
 
+BATCH_FIELDS = ("id", "job_title", "job_desc", "status", "created_at", "candidate_count", "timings")
+DEFAULT_BATCH_FIELDS = ("id", "job_title", "status", "created_at", "candidate_count")
+
+
 @app.get("/batches")
-def list_batches(current_user: dict = Depends(get_current_user)):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT b.id, b.job_title, b.status, b.created_at,
-               COUNT(c.id) AS candidate_count
-        FROM batches b
-        LEFT JOIN candidates c ON c.batch_id = b.id
-        WHERE b.user_id = %s
-        GROUP BY b.id
-        ORDER BY b.created_at DESC
-        LIMIT 20
-    """, (current_user["id"],))
-    rows = [dict(r) for r in cur.fetchall()]
-    cur.close(); conn.close()
-    return rows
-
-
-@app.get("/batches/{batch_id}")
-def get_batch(batch_id: int, current_user: dict = Depends(get_current_user)):
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # Verify ownership
-    cur.execute("SELECT id FROM batches WHERE id = %s AND user_id = %s", (batch_id, current_user["id"]))
-    if not cur.fetchone():
-        cur.close(); conn.close()
-        raise HTTPException(status_code=404, detail="Batch not found")
+def list_batches(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Newest batches first. The next page's cursor is returned in the X-Next-Cursor
+    header; `fields=id,job_title` limits the columns returned.
+    """
+    selected = DEFAULT_BATCH_FIELDS
+    if fields:
+        selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = set(selected) - set(BATCH_FIELDS)
+        if unknown or not selected:
+            raise HTTPException(status_code=400, detail=f"fields must be a subset of {', '.join(BATCH_FIELDS)}")
+    # id and created_at are always read: they form the pagination key
+    columns = list(dict.fromkeys(("id", "created_at") + selected))
 
-    cur.execute("""
-        SELECT c.*, array_agg(DISTINCT c.keywords) as kws
-        FROM candidates c
-        WHERE c.batch_id = %s
-        ORDER BY c.rank_position
-    """, (batch_id,))
-    candidates_raw = [dict(r) for r in cur.fetchall()]
+    where, params = "user_id = %s", [current_user["id"]]
+    if cursor:
+        after_created, after_id = _decode_cursor(cursor, 2)
+        try:
+            params += [datetime.fromisoformat(after_created), int(after_id)]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where += " AND (created_at, id) < (%s, %s)"
 
-    result = []
-    for cand in candidates_raw:
-        # Sections
-        cur.execute("SELECT * FROM sections WHERE candidate_id = %s", (cand["id"],))
-        sections = {r["section_name"]: {
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT {", ".join(columns)}
+            FROM batches
+            WHERE {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """, params + [limit + 1])
+        rows = cur.fetchall()
+
+    page = rows[:limit]
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor([page[-1]["created_at"].isoformat(), page[-1]["id"]])
+    return [{f: r[f] for f in selected} for r in page]
+
+
+@app.get("/batches/{batch_id}", response_model=BatchOut)
+def get_batch(batch_id: int, request: Request, compact: bool = Query(False),
+              current_user: dict = Depends(get_current_user)):
+    return _batch_response(batch_id, current_user["id"], request.headers.get("if-none-match"), compact)
+
+
+def _batch_response(batch_id: int, user_id: int, if_none_match: Optional[str], compact: bool = False) -> Response:
+    """
+    Batch payload as a pre-serialized response with a strong ETag. Finished
+    batches are served from batch_responses after one primary-key lookup
+    (ownership plus candidate_count, which every append bumps), so a cached
+    body never outlives a write made through another worker process.
+    """
+    variant = "compact" if compact else None
+    generation = batch_responses.generation(batch_id)
+    with get_cursor() as cur:
+        cur.execute("SELECT status, candidate_count FROM batches WHERE id = %s AND user_id = %s",
+                    (batch_id, user_id))
+        batch = cur.fetchone()
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+
+        cached = batch_responses.get(batch_id, user_id, batch["candidate_count"], variant)
+        feedback_ids = set() if compact else None
+        result = None if cached else _load_batch_candidates(cur, batch_id, feedback_ids)
+
+    if cached:
+        body, etag = cached
+    else:
+        payload = {"batch_id": batch_id, "candidates": result}
+        if compact:
+            payload["feedbackTexts"] = feedback_table(feedback_ids)
+        body = dumps(payload)
+        if batch["status"] == "done":
+            etag = batch_responses.set(batch_id, user_id, batch["candidate_count"], body, generation, variant)
+        else:
+            etag = make_etag(body)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _load_batch_candidates(cur, batch_id: int, feedback_ids: Optional[set] = None) -> list:
+    """
+    Assemble the ranked candidate payload for a batch in three queries. With a
+    `feedback_ids` set, feedback is emitted as ids (compact) and collected there.
+    """
+    cur.execute("SELECT * FROM candidates WHERE batch_id = %s ORDER BY rank_position", (batch_id,))
+    candidates_raw = cur.fetchall()
+    ids = [c["id"] for c in candidates_raw]
+    if not ids:
+        return []
+
+    sections = {cid: {} for cid in ids}
+    cur.execute("""
+        SELECT candidate_id, section_name, score, weight, level, feedback
+        FROM sections
+        WHERE candidate_id = ANY(%s)
+        ORDER BY id
+    """, (ids,))
+    for r in cur.fetchall():
+        feedback = r["feedback"]
+        if feedback_ids is not None:
+            feedback = feedback_id(feedback)
+            feedback_ids.add(feedback)
+        sections[r["candidate_id"]][r["section_name"]] = {
             "score": float(r["score"]),
             "weight": float(r["weight"]),
             "level": r["level"],
-            "feedback": r["feedback"],
-        } for r in cur.fetchall()}
+            "feedback": feedback,
+        }
 
-        # Insights
-        cur.execute("SELECT type, text FROM insights WHERE candidate_id = %s", (cand["id"],))
-        insights = [{"type": r["type"], "text": r["text"]} for r in cur.fetchall()]
+    insights = {cid: [] for cid in ids}
+    cur.execute("""
+        SELECT candidate_id, type, text
+        FROM insights
+        WHERE candidate_id = ANY(%s)
+        ORDER BY id
+    """, (ids,))
+    for r in cur.fetchall():
+        insights[r["candidate_id"]].append({"type": r["type"], "text": r["text"]})
 
-        result.append({
-            "id": cand["id"],
-            "name": cand["name"],
-            "role": cand["role"],
-            "email": cand["email"],
-            "phone": cand["phone"],
-            "education": cand["education"],
-            "experience": cand["experience"],
-            "location": cand["location"],
-            "total": float(cand["total_score"]),
-            "topsis": float(cand["topsis_score"]),
-            "rank": cand["rank_position"],
-            "grade": cand["grade"],
-            "gradeColor": cand["grade_color"],
-            "avatar": cand["avatar"],
-            "color": cand["avatar_color"],
-            "keywords": cand["keywords"] or [],
-            "sections": sections,
-            "insights": insights,
-        })
+    return [{
+        "id": cand["id"],
+        "name": cand["name"],
+        "role": cand["role"],
+        "email": cand["email"],
+        "phone": cand["phone"],
+        "education": cand["education"],
+        "experience": cand["experience"],
+        "location": cand["location"],
+        "total": float(cand["total_score"]),
+        "topsis": float(cand["topsis_score"]),
+        "relevance": cand["relevance"],
+        "rank": cand["rank_position"],
+        "grade": cand["grade"],
+        "gradeColor": cand["grade_color"],
+        "avatar": cand["avatar"],
+        "color": cand["avatar_color"],
+        "keywords": cand["keywords"] or [],
+        "sections": sections[cand["id"]],
+        "insights": insights[cand["id"]],
+    } for cand in candidates_raw]
 
-    cur.close(); conn.close()
-    return {"batch_id": batch_id, "candidates": result}
 
+def _get_owned_batch(batch_id: int, user_id: int) -> dict:
+    with get_cursor() as cur:
+        cur.execute("""
+            SELECT id, status, job_desc, candidate_count
+            FROM batches
+            WHERE id = %s AND user_id = %s
+        """, (batch_id, user_id))
+        row = cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return dict(row)
 
-@app.get("/latest-batch")
-def get_latest_batch(current_user: dict = Depends(get_current_user)):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT id FROM batches
-        WHERE user_id = %s AND status = 'done'
-        ORDER BY created_at DESC
-        LIMIT 1
-    """, (current_user["id"],))
-    row = cur.fetchone()
-    cur.close(); conn.close()
+
+def _batch_status(batch: dict) -> dict:
+    job = get_job(batch["id"])
+    if job:
+        return job.snapshot()
+    # Job ran in another worker (or before a restart): report what the DB knows
+    count = batch["candidate_count"]
+    return {
+        "batch_id": batch["id"],
+        "status": batch["status"],
+        "total": count,
+        "processed": count,
+        "progress": 1.0 if batch["status"] == "done" else 0.0,
+        "files": [],
+        "error": None,
+    }
+
+
+@app.get("/batches/{batch_id}/status")
+def get_batch_status(batch_id: int, current_user: dict = Depends(get_current_user)):
+    return _batch_status(_get_owned_batch(batch_id, current_user["id"]))
+
+
+@app.get("/batches/{batch_id}/events")
+async def stream_batch_status(batch_id: int, current_user: dict = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of batch progress. Progress is sent as unnamed
+    events; the final snapshot is sent as `event: end` and the stream closes.
+    The endpoint needs the Authorization header, which EventSource cannot send:
+    read it with fetch() and a stream reader (see README).
+    """
+    batch = await run_in_threadpool(_get_owned_batch, batch_id, current_user["id"])
+
+    async def events():
+        job = get_job(batch_id)
+        version = -1
+        while True:
+            snapshot = job.snapshot() if job else _batch_status(batch)
+            if not job or job.finished:
+                yield f"event: end\ndata: {json.dumps(snapshot)}\n\n"
+                return
+            if job.version != version:
+                version = job.version
+                yield f"data: {json.dumps(snapshot)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            await job.wait_changed(version, timeout=15)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/latest-batch", response_model=BatchOut)
+def get_latest_batch(request: Request, compact: bool = Query(False),
+                     current_user: dict = Depends(get_current_user)):
+    with get_cursor() as cur:
+        cur.execute("""
+            SELECT id FROM batches
+            WHERE user_id = %s AND status = 'done'
+            ORDER BY created_at DESC
+            LIMIT 1
+        """, (current_user["id"],))
+        row = cur.fetchone()
 
     if not row:
         raise HTTPException(status_code=404, detail="No completed batches found")
-    return get_batch(row["id"], current_user)
+    return _batch_response(row["id"], current_user["id"], request.headers.get("if-none-match"), compact)
 
 
 # ── HELPERS ───────────────────────────────────────────────────────────────────
 
-def _format_candidate(p: dict) -> dict:
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _encode_cursor(values: list) -> str:
+    """Opaque keyset-pagination cursor."""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _format_candidate(p: dict, feedback_ids: Optional[set] = None) -> dict:
     return {
         "id": p.get("db_id", 0),
         "name": p["name"],
@@ -342,22 +1021,39 @@ def _format_candidate(p: dict) -> dict:
         "location": p["location"],
         "total": p["total_score"],
         "topsis": p["topsis_score"],
+        "relevance": p.get("relevance"),
         "rank": p["rank"],
         "grade": p["grade"],
         "gradeColor": p["grade_color"],
         "avatar": p["avatar"],
         "color": p["avatar_color"],
         "keywords": p.get("keywords", []),
-        "sections": p["sections"],
+        "sections": p["sections"] if feedback_ids is None else compact_sections(p["sections"], feedback_ids),
         "insights": p["insights"],
     }
 
 
 # ── HEALTH ────────────────────────────────────────────────────────────────────
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of stage, file, DB and pool metrics (this process only)."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once heavy dependencies and models are loaded."""
+    state = registry.status()
+    if not state["ready"]:
+        return JSONResponse(status_code=503, content=state)
+    return state
+
+
 @app.get("/health")
 def health():
-    return {"status": "ok", "service": "RankSense AI API"}
+    return {"status": "ok", "service": "RankSense AI API", "db_pool": pool_stats(),
+            "resume_cache": resume_cache.stats(), "batch_cache": batch_responses.stats()}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""
+RankSense AI — Multi-pattern keyword matcher
+Aho–Corasick automaton over a case-folded dictionary: one pass over the text
+finds every dictionary term, whatever the dictionary size. Matches must sit on
+word boundaries, so "Go" does not fire inside "Google" nor "Java" inside
+"JavaScript".
+"""
+from typing import Iterable, List
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = []
+        self._goto = [{}]      # state -> {char: next state}
+        self._fail = [0]
+        self._out = [[]]       # state -> indices of terms ending here
+        seen = set()
+        for term in terms:
+            key = term.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                self._add(key, len(self.terms))
+                self.terms.append(term.strip())
+        self._lengths = [len(t.lower()) for t in self.terms]
+        # a boundary is only required next to word characters: "C++" may be followed by anything
+        self._bound_start = [_is_word_char(t.lower()[0]) for t in self.terms]
+        self._bound_end = [_is_word_char(t.lower()[-1]) for t in self.terms]
+        self._build_failure_links()
+
+    def _add(self, key: str, idx: int):
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(idx)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]; head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[int]:
+        """Indices of the dictionary terms present in `text`, in dictionary order."""
+        lowered = text.lower()
+        n = len(lowered)
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                if idx in found:
+                    continue
+                start = i - self._lengths[idx] + 1
+                if self._bound_start[idx] and start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if self._bound_end[idx] and i + 1 < n and _is_word_char(lowered[i + 1]):
+                    continue
+                found.add(idx)
+        return sorted(found)
+
+    def find_terms(self, text: str) -> List[str]:
+        return [self.terms[i] for i in self.find(text)]
@@ -0,0 +1,171 @@
+"""
+RankSense AI — Metrics
+Minimal in-process Prometheus-style histograms and counters, rendered in the
+text exposition format by GET /metrics. Parser worker processes do not record
+here; they return their timings with each result and the parent observes them
+(see pipeline.py). BatchTimings accumulates one batch's per-stage breakdown,
+which is also stored on the batches row.
+"""
+import time, threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS   = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+PAGES_BUCKETS   = (1, 2, 3, 5, 10, 20, 50, 100)
+
+_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+_collectors: List[Callable[[], List[Tuple[str, str, dict, float]]]] = []
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = SECONDS_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelKey, list] = {}   # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            idx = bisect_left(self.buckets, value)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = []
+        with _lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for key, series in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {series[-1]}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with _lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {v:g}" for k, v in items]
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def histogram(name: str, help_text: str, buckets: Sequence[float] = SECONDS_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, buckets))
+
+
+def counter(name: str, help_text: str) -> Counter:
+    return _register(Counter(name, help_text))
+
+
+def register_collector(fn: Callable[[], List[Tuple[str, str, dict, float]]]):
+    """fn() returns [(name, help, labels, value)] gauges, read at scrape time (pool sizes, caches)."""
+    _collectors.append(fn)
+
+
+def render() -> str:
+    lines = []
+    for metric in list(_metrics.values()):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    seen = set()
+    for collect in _collectors:
+        for name, help_text, labels, value in collect():
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_fmt_labels(_label_key(labels))} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+# ── APPLICATION METRICS ──────────────────────────────────────────────────────
+
+STAGE_SECONDS = histogram("ranksense_stage_seconds", "Time spent per pipeline stage")
+FILE_BYTES    = histogram("ranksense_file_bytes", "Uploaded resume size in bytes", BYTES_BUCKETS)
+FILE_PAGES    = histogram("ranksense_file_pages", "Pages per uploaded PDF", PAGES_BUCKETS)
+DB_QUERY_SECONDS = histogram("ranksense_db_query_seconds", "Database statement latency")
+RESUME_CACHE  = counter("ranksense_resume_cache_total", "Resume cache lookups by result")
+OCR_PAGES     = counter("ranksense_ocr_pages_total", "PDF pages without a text layer recognized by OCR")
+
+
+class BatchTimings:
+    """
+    Per-stage seconds for one batch. Stages timed here are also observed in
+    ranksense_stage_seconds; add() accumulates (e.g. summed worker times).
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._tlock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, observe: bool = True):
+        with self._tlock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+        if observe:
+            STAGE_SECONDS.observe(seconds, stage=stage)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def as_dict(self) -> dict:
+        with self._tlock:
+            stages = {k: round(v, 4) for k, v in self._stages.items()}
+        return {**stages, "total": round(time.perf_counter() - self._started, 4)}
+
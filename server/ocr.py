@@ -0,0 +1,137 @@
+"""
+RankSense AI — OCR fallback for scanned PDFs
+Pages without a text layer are rasterized (sequentially: PDF documents are
+not thread-safe) and OCR'd with Tesseract on a small thread pool; each page is
+a separate tesseract process, so threads run them in parallel. DPI adapts to
+the page size and to how many pages need OCR, and every document gets a time
+budget: pages still pending when it runs out are left empty instead of
+stalling the batch.
+"""
+import os, time, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+import registry
+
+load_dotenv()
+
+OCR_ENABLED      = os.getenv("OCR_ENABLED", "1") == "1"
+OCR_WORKERS      = int(os.getenv("OCR_WORKERS", 2))          # per extraction process
+OCR_LANG         = os.getenv("OCR_LANG", "eng")
+OCR_MIN_CHARS    = int(os.getenv("OCR_MIN_CHARS", 20))       # pages with less text are OCR'd
+OCR_DOC_BUDGET_S = float(os.getenv("OCR_DOC_BUDGET_S", 20))
+OCR_MIN_DPI      = int(os.getenv("OCR_MIN_DPI", 120))
+OCR_MAX_DPI      = int(os.getenv("OCR_MAX_DPI", 300))
+OCR_TARGET_PX    = 2500   # rasterized page width Tesseract reads well
+OCR_MANY_PAGES   = 4      # beyond this many scanned pages, trade resolution for time
+
+_failed = False
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _load_tesseract():
+    import pytesseract
+    pytesseract.get_tesseract_version()   # fails fast when the binary is missing
+    return pytesseract
+
+
+if OCR_ENABLED:
+    registry.register("tesseract", _load_tesseract)
+
+
+def get_tesseract():
+    """pytesseract, or None if OCR is disabled or Tesseract is not installed."""
+    global _failed
+    if _failed or not OCR_ENABLED:
+        return None
+    try:
+        return registry.get("tesseract")
+    except Exception as e:
+        print(f"Tesseract unavailable, skipping OCR: {e}")
+        _failed = True
+        return None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+        return _executor
+
+
+def needs_ocr(text: Optional[str]) -> bool:
+    return len((text or "").strip()) < OCR_MIN_CHARS
+
+
+def choose_dpi(page_width_pt: float, n_pages: int) -> int:
+    """Resolution that makes the page ~OCR_TARGET_PX wide, lowered for long scans."""
+    dpi = OCR_TARGET_PX / max(page_width_pt / 72, 1)
+    if n_pages > OCR_MANY_PAGES:
+        dpi *= 0.75
+    return int(min(max(dpi, OCR_MIN_DPI), OCR_MAX_DPI))
+
+
+def ocr_pages(pages: List, budget_s: float = OCR_DOC_BUDGET_S) -> Dict[int, str]:
+    """
+    OCR the given pages (resume_parser.PdfPage: `.width` in points and
+    `.render(dpi)` -> PIL image) within `budget_s` seconds.
+    Returns {index into `pages`: text} for the pages that finished in time.
+    """
+    tesseract = get_tesseract()
+    if tesseract is None or not pages:
+        return {}
+    deadline = time.monotonic() + budget_s
+    executor = _get_executor()
+
+    def run(image, timeout: float) -> str:
+        try:
+            return tesseract.image_to_string(image, lang=OCR_LANG, timeout=max(timeout, 1))
+        except RuntimeError:   # tesseract killed at the timeout
+            return ""
+        finally:
+            image.close()
+
+    futures, pending = {}, set()
+    for i, page in enumerate(pages):
+        # Rasterized pages are large: keep at most two per worker waiting in memory
+        while len(pending) >= OCR_WORKERS * 2 and deadline > time.monotonic():
+            _, pending = wait(pending, timeout=deadline - time.monotonic(), return_when=FIRST_COMPLETED)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            image = page.render(choose_dpi(page.width, len(pages)))
+        except Exception as e:
+            print(f"OCR rasterize error: {e}")
+            continue
+        future = executor.submit(run, image, remaining)
+        futures[future] = i
+        pending.add(future)
+
+    done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+    for f in not_done:
+        f.cancel()
+    if not_done:
+        print(f"OCR budget of {budget_s:g}s exhausted, {len(not_done)} page(s) skipped")
+    return {futures[f]: f.result() for f in done if not f.exception()}
+
+
+def limit_threads():
+    """
+    One tesseract process per page already: keep each single-threaded. Only for
+    parser worker processes (pipeline._init_worker); set globally it would also
+    cap OpenMP runtimes loaded later, such as torch in the API process.
+    """
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def shutdown_ocr():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
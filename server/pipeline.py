@@ -0,0 +1,170 @@
+"""
+RankSense AI — Extraction / scoring stage
+Fans a batch of resumes out across a process pool so CPU-bound parsing
+(pdfplumber, regex scoring) never runs on the event loop. Results are cached
+by content hash, so a resume seen before is never parsed again.
+"""
+import os, copy, asyncio, threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+import ocr
+import registry
+from cache import resume_cache
+from ingest import SpooledUpload
+from metrics import BatchTimings, STAGE_SECONDS, FILE_BYTES, FILE_PAGES, RESUME_CACHE, OCR_PAGES
+from resume_parser import extract_and_analyze, rename_analysis, get_avatar_color, pdf_backend
+
+load_dotenv()
+
+# 0 disables the pool: resumes are then parsed in the threadpool instead.
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", os.cpu_count() or 1))
+# Workers must not be forked from the API process once it holds the relevance
+# model (torch threads, copy-on-write memory): forkserver starts them clean.
+EXTRACT_START_METHOD = os.getenv("EXTRACT_START_METHOD", "forkserver")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()   # the warm-up thread and request handlers both call get_pool()
+_inflight: Dict[str, asyncio.Future] = {}   # content hash -> extraction in progress
+
+
+def _init_worker(mode: str):
+    ocr.limit_threads()
+    if mode == "eager":
+        registry.warm_up(registry.PARSER_DEPS)
+        pdf_backend()   # resolve (and import) the PDF backend up front
+
+
+def _mp_context():
+    if EXTRACT_START_METHOD in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context(EXTRACT_START_METHOD)
+    return None   # e.g. forkserver on Windows: platform default
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    with _pool_lock:
+        if _pool is None and EXTRACT_WORKERS > 0:
+            _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=_mp_context(),
+                                        initializer=_init_worker, initargs=(registry.WARMUP_MODE,))
+        return _pool
+
+
+def warm_pool():
+    """Start every pool worker now so its initializer preloads the parser dependencies."""
+    pool = get_pool()
+    if pool is not None:
+        for f in [pool.submit(os.getpid) for _ in range(EXTRACT_WORKERS)]:
+            f.result()
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _replace_broken_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died (OOM kill, segfault); get_pool() then starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    print("Extraction pool broken, restarting it")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(fn, *args):
+    pool = get_pool()
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # Retry once on a new pool; a file that kills that one too fails the request
+        _replace_broken_pool(pool)
+        return await loop.run_in_executor(get_pool(), fn, *args)
+
+
+def _record(timings: Optional[BatchTimings], stage: str, seconds: float):
+    if timings is not None:
+        timings.add(stage, seconds)
+    else:
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+async def parse_one(upload: SpooledUpload, timings: Optional[BatchTimings] = None) -> dict:
+    """Parse a single resume, going through the content-hash cache. The result carries the extracted "text"."""
+    filename = upload.filename
+    fmt = filename.rsplit(".", 1)[-1].lower()
+    # The extension picks the extractor, so the same bytes as .pdf and .txt are different entries
+    digest = f"{upload.digest}-{fmt}"
+    FILE_BYTES.observe(upload.size, format=fmt)
+    pending = _inflight.get(digest)
+    if pending is not None:
+        # Identical file already being extracted (e.g. duplicate upload): wait and reuse it
+        await asyncio.shield(pending)
+    cached = await resume_cache.aget(digest)
+
+    if cached is not None and cached["filename"] == filename:
+        RESUME_CACHE.inc(result="hit")
+        return {**copy.deepcopy(cached["fields"]), "text": cached["text"]}
+    if cached is not None:
+        # Same bytes under another name: keep the scores, only the name fallback may differ
+        RESUME_CACHE.inc(result="rename")
+        text = cached["text"]
+        fields = rename_analysis(copy.deepcopy(cached["fields"]), filename, text)
+    else:
+        RESUME_CACHE.inc(result="miss")
+        done = asyncio.get_running_loop().create_future()
+        _inflight[digest] = done
+        try:
+            # Spooled files travel to the worker as a path, small ones as bytes;
+            # the worker reports its own stage times back with the result
+            text, fields, stats = await _run(extract_and_analyze, filename, upload.source)
+        finally:
+            del _inflight[digest]
+            done.set_result(None)
+        _record(timings, "extract", stats["extract_s"])
+        _record(timings, "score", stats["score_s"])
+        if stats["pages"]:
+            FILE_PAGES.observe(stats["pages"], format=fmt)
+        if stats.get("ocr_pages"):
+            OCR_PAGES.inc(stats["ocr_pages"])
+
+    await resume_cache.aset(digest, {"filename": filename, "text": text, "fields": copy.deepcopy(fields)})
+    return {**fields, "text": text}
+
+
+async def process_batch(files: List[SpooledUpload],
+                        on_file_done: Optional[Callable[[int], None]] = None,
+                        color_offset: int = 0,
+                        timings: Optional[BatchTimings] = None) -> List[dict]:
+    """
+    files: ingested uploads (see ingest.py) in upload order.
+    on_file_done: optional callback, called with the upload index as each file finishes.
+    color_offset: first color_idx, for files appended to an existing batch.
+    timings: optional per-batch accumulator for extract/score seconds.
+    Returns the parsed resumes in the same order, with color_idx set to the
+    upload position (+ color_offset).
+    """
+    async def _one(idx: int, upload: SpooledUpload) -> dict:
+        result = await parse_one(upload, timings)
+        result["color_idx"] = color_offset + idx
+        result["avatar_color"] = get_avatar_color(color_offset + idx)
+        if on_file_done:
+            on_file_done(idx)
+        return result
+
+    return list(await asyncio.gather(*(
+        _one(idx, upload) for idx, upload in enumerate(files)
+    )))
@@ -0,0 +1,81 @@
+"""
+RankSense AI — Heavy dependency / model registry
+Modules and models are registered by name and loaded once per process, either
+eagerly at startup (WARMUP_MODE=eager, the default) or on first use
+(WARMUP_MODE=lazy). /ready reports when the eager warm-up has finished.
+"""
+import os, time, importlib, threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WARMUP_MODE = os.getenv("WARMUP_MODE", "eager")   # eager | lazy
+
+_loaders: Dict[str, Callable[[], Any]] = {}
+_loaded: Dict[str, Any] = {}
+_load_seconds: Dict[str, float] = {}
+_errors: Dict[str, str] = {}
+_lock = threading.RLock()
+_warm = threading.Event()
+
+
+def register(name: str, loader: Callable[[], Any]):
+    _loaders[name] = loader
+
+
+def register_module(name: str, module: Optional[str] = None):
+    register(name, lambda: importlib.import_module(module or name))
+
+
+def get(name: str) -> Any:
+    """Return the loaded dependency, loading it now if needed. Raises if loading fails."""
+    try:
+        return _loaded[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _loaded:
+            start = time.perf_counter()
+            try:
+                _loaded[name] = _loaders[name]()
+            except Exception as e:
+                _errors[name] = str(e)
+                raise
+            _load_seconds[name] = round(time.perf_counter() - start, 3)
+            _errors.pop(name, None)
+        return _loaded[name]
+
+
+def warm_up(names: Optional[Iterable[str]] = None):
+    """Load the given (default: all registered) dependencies; failures are logged, not raised."""
+    for name in (list(names) if names is not None else list(_loaders)):
+        try:
+            get(name)
+        except Exception as e:
+            print(f"Warm-up of {name} failed: {e}")
+
+
+def mark_ready():
+    _warm.set()
+
+
+def is_ready() -> bool:
+    return WARMUP_MODE == "lazy" or _warm.is_set()
+
+
+def status() -> dict:
+    return {
+        "ready": is_ready(),
+        "mode": WARMUP_MODE,
+        "loaded": dict(_load_seconds),
+        "pending": [n for n in _loaders if n not in _loaded and n not in _errors],
+        "errors": dict(_errors),
+    }
+
+
+# Parser dependencies (imported inside worker processes too)
+PARSER_DEPS = ("pdfplumber", "docx", "numpy")
+for _name in PARSER_DEPS:
+    register_module(_name)
@@ -0,0 +1,119 @@
+"""
+RankSense AI — Job-description relevance
+Embeds resume chunks and the job description with a sentence-transformers
+model (loaded once per worker, CPU) and turns their cosine similarity into a
+0–100 "Relevance" criterion for TOPSIS. Embeddings are cached by text hash and
+a whole upload is encoded in one batched call.
+"""
+import os, hashlib
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+import registry
+from cache import LRUCache
+
+load_dotenv()
+
+RELEVANCE_ENABLED    = os.getenv("RELEVANCE_ENABLED", "1") == "1"
+RELEVANCE_MODEL      = os.getenv("RELEVANCE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+RELEVANCE_WEIGHT     = float(os.getenv("RELEVANCE_WEIGHT", 20))
+RELEVANCE_BATCH_SIZE = int(os.getenv("RELEVANCE_BATCH_SIZE", 64))
+EMBED_CACHE_SIZE     = int(os.getenv("EMBED_CACHE_SIZE", 20000))
+
+CHUNK_WORDS = 80   # resume text is embedded in ~paragraph-sized chunks
+TOP_CHUNKS  = 3    # relevance = mean similarity of the best-matching chunks
+
+_model_failed = False
+_embeddings = LRUCache(EMBED_CACHE_SIZE)
+
+
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(RELEVANCE_MODEL, device="cpu")
+
+
+if RELEVANCE_ENABLED:
+    registry.register("relevance_model", _load_model)
+
+
+def get_model():
+    """The sentence-transformers model, or None if unavailable/disabled."""
+    global _model_failed
+    if _model_failed or not RELEVANCE_ENABLED:
+        return None
+    try:
+        return registry.get("relevance_model")
+    except Exception as e:
+        print(f"Relevance model unavailable, skipping relevance scoring: {e}")
+        _model_failed = True
+        return None
+
+
+def split_chunks(text: str, max_words: int = CHUNK_WORDS) -> List[str]:
+    """Group non-empty lines into chunks of at most ~max_words words."""
+    chunks, current, count = [], [], 0
+    for line in text.split("\n"):
+        words = len(line.split())
+        if not words:
+            continue
+        if current and count + words > max_words:
+            chunks.append(" ".join(current))
+            current, count = [], 0
+        current.append(line.strip())
+        count += words
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def embed(texts: List[str]):
+    """Normalized embeddings (n × dim numpy array); cache misses are encoded in one batch."""
+    np = registry.get("numpy")
+
+    model = get_model()
+    keys = [_key(t) for t in texts]
+    vectors = [_embeddings.get(k) for k in keys]
+    missing = {}
+    for i, (k, v) in enumerate(zip(keys, vectors)):
+        if v is None:
+            missing.setdefault(k, []).append(i)
+
+    if missing:
+        todo = [texts[idxs[0]] for idxs in missing.values()]
+        encoded = model.encode(todo, batch_size=RELEVANCE_BATCH_SIZE, convert_to_numpy=True,
+                               normalize_embeddings=True, show_progress_bar=False)
+        for (k, idxs), vec in zip(missing.items(), encoded):
+            vec = vec.astype(np.float32)
+            _embeddings.set(k, vec)
+            for i in idxs:
+                vectors[i] = vec
+
+    return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+
+def score_relevance(job_desc: Optional[str], resume_texts: List[str]) -> Optional[List[float]]:
+    """
+    Relevance (0–100) of each resume to the job description, in input order.
+    Returns None when there is no job description or no model.
+    """
+    if not job_desc or not job_desc.strip() or not resume_texts or get_model() is None:
+        return None
+    np = registry.get("numpy")
+
+    chunks_per_resume = [split_chunks(t) for t in resume_texts]
+    flat = [c for chunks in chunks_per_resume for c in chunks]
+    vectors = embed([job_desc.strip()] + flat)
+    sims = vectors[1:] @ vectors[0] if flat else np.zeros(0, dtype=np.float32)
+
+    scores, pos = [], 0
+    for chunks in chunks_per_resume:
+        resume_sims = np.sort(sims[pos:pos + len(chunks)])[::-1][:TOP_CHUNKS]
+        pos += len(chunks)
+        best = float(resume_sims.mean()) if len(resume_sims) else 0.0
+        scores.append(round(min(max(best, 0.0), 1.0) * 100, 1))
+    return scores
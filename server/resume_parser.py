@@ -2,39 +2,193 @@
 Resume parsing utilities — extract text + sections from PDF/DOCX.
 Then score each section, compute TOPSIS ranking.
 """
-import io, re, random
-from typing import Optional
+import os, io, re, json, time, random
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from typing import BinaryIO, Optional, Union
+
+import ocr
+import registry
+from matcher import KeywordMatcher
 
 # ── TEXT EXTRACTION ─────────────────────────────────────────────────────────
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+# A resume "source" is the raw bytes, the path of a spooled upload, or an open
+# binary file object; parsers read it as a stream without copying it.
+Source = Union[bytes, str, BinaryIO]
+
+
+def _is_buffer(source: Source) -> bool:
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def open_source(source: Source):
+    if _is_buffer(source):
+        return io.BytesIO(source)
+    if isinstance(source, str):
+        return open(source, "rb")
+    return nullcontext(source)
+
+
+# ── PDF BACKENDS ──
+# Each backend opens a document from a Source (spooled uploads by path, so the
+# file is never read into memory whole) and yields (page_count, lazy iterator of PdfPage),
+# so extraction can stop after PDF_MAX_PAGES / PDF_MAX_CHARS without touching
+# the remaining pages. "auto" picks the first installed of pypdfium2 (Apache-2.0 /
+# BSD) and PyMuPDF (AGPL-3.0, so opt-in: not in requirements.txt); pdfplumber is
+# the fallback when a backend is missing or fails on a file.
+
+PDF_BACKEND   = os.getenv("PDF_BACKEND", "auto")          # auto | pymupdf | pypdfium2 | pdfplumber
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 5))        # 0 = no limit
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", 40000))    # 0 = no limit
+
+# text: extracted text layer; width: points; render(dpi) -> PIL image, for OCR
+PdfPage = namedtuple("PdfPage", "text width render")
+
+
+def _load_pymupdf():
+    try:
+        import pymupdf
+    except ImportError:   # PyMuPDF < 1.24.3 only ships the fitz name
+        import fitz as pymupdf
+    return pymupdf
+
+
+registry.register("pymupdf", _load_pymupdf)
+registry.register_module("pypdfium2")
+
+
+@contextmanager
+def _pymupdf_document(source: Source):
+    pymupdf = registry.get("pymupdf")
+    if isinstance(source, str):
+        doc = pymupdf.open(source, filetype="pdf")
+    else:
+        doc = pymupdf.open(stream=source if _is_buffer(source) else source.read(), filetype="pdf")
+
+    def render(page, dpi):
+        from PIL import Image
+        pix = page.get_pixmap(dpi=dpi)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    try:
+        yield doc.page_count, (PdfPage(page.get_text(), page.rect.width, lambda dpi, page=page: render(page, dpi))
+                               for page in doc)
+    finally:
+        doc.close()
+
+
+@contextmanager
+def _pypdfium2_document(source: Source):
+    pdfium = registry.get("pypdfium2")
+    # Path, bytes or file object; paths and files are read lazily
+    pdf = pdfium.PdfDocument(bytes(source) if isinstance(source, memoryview) else source)
+
+    def pages():
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            text = textpage.get_text_bounded().replace("\r\n", "\n")   # text inside the page box
+            textpage.close()
+            yield PdfPage(text, page.get_width(), lambda dpi, page=page: page.render(scale=dpi / 72).to_pil())
+
+    try:
+        yield len(pdf), pages()
+    finally:
+        pdf.close()
+
+
+@contextmanager
+def _pdfplumber_document(source: Source):
+    with open_source(source) as stream, registry.get("pdfplumber").open(stream) as pdf:
+        yield len(pdf.pages), (PdfPage(p.extract_text() or "", p.width,
+                                       lambda dpi, p=p: p.to_image(resolution=dpi).original)
+                               for p in pdf.pages)
+
+
+PDF_BACKENDS = {   # "auto" order
+    "pypdfium2":  _pypdfium2_document,
+    "pymupdf":    _pymupdf_document,
+    "pdfplumber": _pdfplumber_document,
+}
+
+
+@lru_cache(maxsize=1)
+def pdf_backend() -> str:
+    """Backend used in this process: PDF_BACKEND, or the first installed one for "auto"."""
+    candidates = list(PDF_BACKENDS) if PDF_BACKEND == "auto" else [PDF_BACKEND, "pdfplumber"]
+    for name in candidates:
+        try:
+            registry.get(name)
+            return name
+        except Exception as e:
+            if PDF_BACKEND != "auto":
+                print(f"PDF backend {name} unavailable, falling back to pdfplumber: {e}")
+    return "pdfplumber"
+
+
+def _extract_pdf(backend: str, source: Source, info: Optional[dict]) -> str:
+    with PDF_BACKENDS[backend](source) as (page_count, pages):
+        texts, scanned, chars = [], [], 0
+        for page in pages:
+            if ocr.needs_ocr(page.text):
+                scanned.append((len(texts), page))
+            texts.append(page.text)
+            chars += len(page.text)
+            if (PDF_MAX_PAGES and len(texts) >= PDF_MAX_PAGES) or (PDF_MAX_CHARS and chars >= PDF_MAX_CHARS):
+                break
+        # Scanned pages (no text layer) go through the OCR fallback while the document is open
+        ocr_texts = ocr.ocr_pages([page for _, page in scanned]) if scanned else {}
+        for j, text in ocr_texts.items():
+            texts[scanned[j][0]] = text
+
+    if info is not None:
+        # ocr_pages: pages actually OCR'd (not those skipped by the budget, or with OCR unavailable)
+        info.update(pages=page_count, pages_read=len(texts), scanned_pages=len(scanned),
+                    ocr_pages=len(ocr_texts), backend=backend)
+    text = "\n".join(texts)
+    return text[:PDF_MAX_CHARS] if PDF_MAX_CHARS else text
+
+
+def extract_text_from_pdf(source: Source, info: Optional[dict] = None, backend: Optional[str] = None) -> str:
+    backend = backend or pdf_backend()
+    try:
+        return _extract_pdf(backend, source, info)
+    except Exception as e:
+        if backend == "pdfplumber":
+            print(f"PDF extract error: {e}")
+            return ""
+        print(f"PDF extract error ({backend}), retrying with pdfplumber: {e}")
+    if not _is_buffer(source) and not isinstance(source, str):
+        source.seek(0)
     try:
-        import pdfplumber
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            return "\n".join(p.extract_text() or "" for p in pdf.pages)
+        return _extract_pdf("pdfplumber", source, info)
     except Exception as e:
         print(f"PDF extract error: {e}")
         return ""
 
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
+def extract_text_from_docx(source: Source) -> str:
     try:
-        from docx import Document
-        doc = Document(io.BytesIO(file_bytes))
+        with open_source(source) as stream:
+            doc = registry.get("docx").Document(stream)
         return "\n".join(p.text for p in doc.paragraphs)
     except Exception as e:
         print(f"DOCX extract error: {e}")
         return ""
 
 
-def extract_text(filename: str, file_bytes: bytes) -> str:
+def extract_text(filename: str, source: Source, info: Optional[dict] = None) -> str:
+    """`info`, if given, receives document facts such as the PDF page count."""
     ext = filename.rsplit(".", 1)[-1].lower()
     if ext == "pdf":
-        return extract_text_from_pdf(file_bytes)
+        return extract_text_from_pdf(source, info)
     elif ext in ("docx", "doc"):
-        return extract_text_from_docx(file_bytes)
+        return extract_text_from_docx(source)
     elif ext == "txt":
-        return file_bytes.decode("utf-8", errors="ignore")
+        with open_source(source) as stream:
+            return io.TextIOWrapper(stream, encoding="utf-8", errors="ignore").read()
     return ""
 
 
@@ -71,36 +225,166 @@ GRADE_MAP = [
 
 AVATAR_COLORS = ["#3b82f6", "#8b5cf6", "#22d3ee", "#f59e0b", "#f43f5e", "#10b981", "#a78bfa"]
 
-TECH_KEYWORDS = [
-    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust",
-    "React", "Vue", "Angular", "Node.js", "FastAPI", "Django", "Flask",
-    "TensorFlow", "PyTorch", "scikit-learn", "SBERT", "LayoutLMv3", "BERT",
-    "Hugging Face", "spaCy", "NLTK", "OpenCV", "Pandas", "NumPy",
-    "SQL", "PostgreSQL", "MongoDB", "Redis", "MySQL",
-    "Docker", "Kubernetes", "AWS", "GCP", "Azure",
-    "Machine Learning", "Deep Learning", "NLP", "Computer Vision",
-    "REST APIs", "GraphQL", "Microservices", "MLOps", "Tableau", "Power BI",
-]
+# Keyword / location dictionaries live in dictionary.json (override with DICTIONARY_FILE)
+DICTIONARY_FILE = os.getenv("DICTIONARY_FILE") or os.path.join(os.path.dirname(__file__), "dictionary.json")
+
 
+def load_dictionary(path: str = DICTIONARY_FILE) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {"keywords": data.get("keywords", []), "locations": data.get("locations", [])}
 
-def score_section(text: str, section: str) -> float:
-    """Score a section based on presence + heuristics."""
+
+_DICTIONARY = load_dictionary()
+TECH_KEYWORDS = _DICTIONARY["keywords"]
+LOCATIONS     = _DICTIONARY["locations"]
+
+_KEYWORD_MATCHER  = KeywordMatcher(TECH_KEYWORDS)
+_LOCATION_MATCHER = KeywordMatcher(LOCATIONS)
+
+
+# ── SINGLE-PASS SCANNER ─────────────────────────────────────────────────────
+# Every pattern is compiled once at import. All section vocabularies are merged
+# into one alternation (longest alternatives first), so a resume is scanned for
+# section terms once instead of once per section.
+
+def _alternatives(pattern: str) -> list:
+    return pattern.strip("()").split("|")
+
+
+_SECTION_RX = {s: re.compile(p, re.IGNORECASE) for s, p in SECTION_PATTERNS.items() if p}
+_SECTION_TERMS_RX = re.compile(
+    "|".join(sorted({a for p in SECTION_PATTERNS.values() if p for a in _alternatives(p)},
+                    key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def _term_section_counts(term: str) -> tuple:
+    """
+    Per-section match counts for one matched term. A term can count for several
+    sections, e.g. "portfolio" (Contact Info + Projects) or "frameworks"
+    (Skills + the "work" in Work Experience).
+    """
+    return tuple((s, n) for s, rx in _SECTION_RX.items() if (n := len(rx.findall(term))))
+
+
+# ── SECTION SEGMENTATION ────────────────────────────────────────────────────
+# Resumes are split once at their headers ("SKILLS", "Work Experience:", or
+# inline as in "Technical Skills: Python, SQL"), so each section is scored on
+# its own span. Text above the first header (name, email, phone, links) is the
+# Contact Info span. Sections without a header are scored on the whole text.
+
+SECTION_HEADERS = {
+    "Contact Info":    r"contact(?: information| info| details)?|personal (?:information|details)",
+    "Education":       r"education(?:al background| and training)?|academic (?:background|qualifications|details)|qualifications",
+    "Work Experience": r"(?:work|professional|relevant|industry) experience|experience|employment(?: history)?|work history|internships?",
+    "Skills":          r"(?:technical |key |core )?skills(?: (?:&|and) (?:tools|technologies))?|technologies|tech stack|core competencies|tools",
+    "Projects":        r"(?:personal |academic |key |selected )?projects",
+    "Achievements":    r"achievements|awards(?: (?:&|and) (?:honou?rs|achievements))?|honou?rs|certifications?|publications|accomplishments",
+    "Summary":         r"(?:professional |career )?summary|(?:career )?objective|(?:professional )?profile|about(?: me)?",
+}
+
+# A header starts a line (after an optional bullet/number) and is either the
+# whole line, with an optional colon, or "Heading: content" — the content is
+# then the first line of the section
+_HEADER_GROUPS = {f"h{i}": s for i, s in enumerate(SECTION_HEADERS)}
+_HEADER_RX = re.compile(
+    r"^[ \t#*•\-\d.]*(?:" + "|".join(f"(?P<{g}>{SECTION_HEADERS[s]})" for g, s in _HEADER_GROUPS.items())
+    + r")(?:[ \t]*:?[ \t]*$|[ \t]*:[ \t]*(?=\S))",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def segment_text(text: str) -> Optional[dict]:
+    r"""
+    Split text at section headers into {section: span text} (headings
+    excluded; repeated sections are concatenated). Returns None when the text
+    has no recognizable headers, in which case callers score the whole text.
+
+    >>> segment_text("Asha Rao\nEDUCATION\nB.Tech, NIT\nTechnical Skills: Python, SQL\n")
+    {'Contact Info': 'Asha Rao\n', 'Education': '\nB.Tech, NIT\n', 'Skills': 'Python, SQL\n'}
+    """
+    headers = [(m.start(), m.end(), _HEADER_GROUPS[m.lastgroup]) for m in _HEADER_RX.finditer(text)]
+    if not headers:
+        return None
+
+    spans = {}
+
+    def add(section: str, chunk: str):
+        spans[section] = f"{spans[section]}\n{chunk}" if section in spans else chunk
+
+    preamble = text[:headers[0][0]]
+    if preamble.strip():
+        add("Contact Info", preamble)
+    for i, (_, end, section) in enumerate(headers):
+        stop = headers[i + 1][0] if i + 1 < len(headers) else len(text)
+        add(section, text[end:stop])
+    return spans
+
+
+def scan_text(text: str) -> dict:
+    """
+    Section term counts, word and line stats, plus the contact/education/experience
+    fields (first-match searches that stop early). With section headers, each
+    section's terms are counted in its own span only ("spans"); sections
+    without a header, or every section when there are no headers, count their
+    terms in one scan of the whole text.
+    """
+    spans = segment_text(text)
+    whole = None
+    if spans is None or any(s not in spans for s in _SECTION_RX):
+        whole = dict.fromkeys(_SECTION_RX, 0)
+        for m in _SECTION_TERMS_RX.finditer(text):
+            for section, n in _term_section_counts(m.group(0).lower()):
+                whole[section] += n
+    if spans is None:
+        matches = whole
+    else:
+        matches = {s: len(rx.findall(spans[s])) if s in spans else whole[s] for s, rx in _SECTION_RX.items()}
+        if "Skills" in spans:
+            # inside a skills section, the listed technologies are the vocabulary
+            matches["Skills"] += len(_KEYWORD_MATCHER.find(spans["Skills"]))
+
+    line_count = text.count("\n") + 1
+    return {
+        "matches": matches,
+        "spans": spans,
+        "word_count": len(text.split()),
+        "line_count": line_count,
+        "avg_line_len": (len(text) - (line_count - 1)) / line_count,
+        "email":      extract_email(text),
+        "phone":      extract_phone(text),
+        "education":  extract_education(text),
+        "experience": extract_experience_years(text),
+    }
+
+
+def score_section(text: str, section: str, scan: Optional[dict] = None) -> float:
+    """Score a section based on presence + heuristics. Pass `scan` to reuse a scan_text() result."""
     if not text or len(text) < 10:
         return random.uniform(40, 60)
 
-    pattern = SECTION_PATTERNS.get(section)
-    if pattern is None:  # Formatting
-        lines = text.split("\n")
-        avg_len = sum(len(l) for l in lines) / max(len(lines), 1)
+    scan = scan or scan_text(text)
+    if SECTION_PATTERNS.get(section) is None:  # Formatting: always the whole document
+        avg_len = scan["avg_line_len"]
         # reward moderate line lengths, penalize extremes
         base = 70 + (10 if 30 < avg_len < 80 else 0) + random.uniform(-8, 8)
         return min(max(base, 45), 98)
 
-    matches = len(re.findall(pattern, text, re.IGNORECASE))
-    word_count = len(text.split())
-    density = matches / max(word_count / 100, 1)
-
-    base = 40 + min(density * 25, 40) + min(word_count / 20, 15)
+    matches = scan["matches"].get(section, 0)
+    spans = scan.get("spans")
+    if spans is None or section not in spans:
+        # No header for this section: term density over the whole text
+        word_count = scan["word_count"]
+        density = matches / max(word_count / 100, 1)
+        base = 40 + min(density * 25, 40) + min(word_count / 20, 15)
+    else:
+        # Having its own section is the main signal; size and vocabulary refine it
+        word_count = len(spans[section].split())
+        density = matches / max(word_count / 100, 1)
+        base = 55 + min(density * 15, 25) + min(word_count / 10, 15)
     return min(max(base + random.uniform(-5, 5), 40), 98)
 
 
@@ -118,9 +402,36 @@ def get_grade(total: float):
     return "C", "#f43f5e"
 
 
+def get_avatar_color(color_idx: int) -> str:
+    return AVATAR_COLORS[color_idx % len(AVATAR_COLORS)]
+
+
+_EMAIL_RX     = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+_PHONE_RX     = re.compile(r"(\+?\d[\d\s\-]{8,13}\d)")
+_EDUCATION_RX = re.compile(
+    r"(IIT\s+\w+|IIM\s+\w+|BITS\s+\w+|NIT\s+\w+|VIT\s+\w+|MIT|Stanford|Harvard|[A-Z][a-z]+ University|[A-Z][a-z]+ College)",
+    re.IGNORECASE
+)
+_YEARS_RX     = re.compile(r"(\d+[\.\d]*)\s*(years?|yrs?)", re.IGNORECASE)
+_JOB_MENTION_RX = re.compile(r"(internship|full.?time|employed|worked at|joining)", re.IGNORECASE)
+
+
+def _first_lines(text: str, n: int) -> list:
+    """First n non-empty stripped lines, without splitting the whole text."""
+    lines, start = [], 0
+    while len(lines) < n and start <= len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            end = len(text)
+        line = text[start:end].strip()
+        if line:
+            lines.append(line)
+        start = end + 1
+    return lines
+
+
 def extract_name(text: str, filename: str) -> str:
-    lines = [l.strip() for l in text.split("\n") if l.strip()]
-    for line in lines[:5]:
+    for line in _first_lines(text, 5):
         if 2 <= len(line.split()) <= 4 and not any(c in line for c in ["@", ".", ":", "/"]):
             return line.title()
     # fallback: filename without extension
@@ -128,107 +439,111 @@ def extract_name(text: str, filename: str) -> str:
 
 
 def extract_email(text: str) -> str:
-    match = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)
+    match = _EMAIL_RX.search(text)
     return match.group(0) if match else ""
 
 
 def extract_phone(text: str) -> str:
-    match = re.search(r"(\+?\d[\d\s\-]{8,13}\d)", text)
+    match = _PHONE_RX.search(text)
     return match.group(0).strip() if match else ""
 
 
 def extract_location(text: str) -> str:
-    cities = ["Mumbai", "Delhi", "Bangalore", "Hyderabad", "Chennai", "Pune",
-              "Kolkata", "Ahmedabad", "Jaipur", "New York", "San Francisco",
-              "London", "Singapore", "Dubai", "Remote"]
-    for city in cities:
-        if city.lower() in text.lower():
-            return city
-    return "Unknown"
+    # first dictionary location present wins, as before
+    found = _LOCATION_MATCHER.find(text)
+    return _LOCATION_MATCHER.terms[found[0]] if found else "Unknown"
 
 
 def extract_education(text: str) -> str:
-    institutions = re.findall(
-        r"(IIT\s+\w+|IIM\s+\w+|BITS\s+\w+|NIT\s+\w+|VIT\s+\w+|MIT|Stanford|Harvard|[A-Z][a-z]+ University|[A-Z][a-z]+ College)",
-        text, re.IGNORECASE
-    )
-    return institutions[0] if institutions else "University"
+    match = _EDUCATION_RX.search(text)
+    return match.group(1) if match else "University"
 
 
 def extract_experience_years(text: str) -> str:
-    match = re.search(r"(\d+[\.\d]*)\s*(years?|yrs?)", text, re.IGNORECASE)
+    match = _YEARS_RX.search(text)
     if match:
         return f"{match.group(1)} yr{'s' if float(match.group(1)) > 1 else ''}"
-    # count internship/job mentions
-    count = len(re.findall(r"(internship|full.?time|employed|worked at|joining)", text, re.IGNORECASE))
-    if count >= 3: return "3+ yrs"
+    # count internship/job mentions (only "3 or more" matters, so stop there)
+    count = 0
+    for _ in _JOB_MENTION_RX.finditer(text):
+        count += 1
+        if count >= 3: return "3+ yrs"
     if count == 2: return "2 yrs"
     return "< 1 yr"
 
 
 def extract_keywords(text: str) -> list:
-    found = []
-    for kw in TECH_KEYWORDS:
-        if kw.lower() in text.lower() and kw not in found:
-            found.append(kw)
-    return found[:10]
+    return _KEYWORD_MATCHER.find_terms(text)[:10]
+
+
+# Static per-section, per-level feedback. Every sentence has a fixed id (its
+# index in FEEDBACK_TEXTS), which compact payloads send instead of the text.
+SECTION_FEEDBACK = {
+    "Contact Info": {
+        "excellent": "All professional channels present — email, phone, LinkedIn, GitHub",
+        "good": "Most contact details present, missing one channel",
+        "moderate": "Basic contact info only, add LinkedIn/GitHub",
+        "poor": "Very minimal contact information provided",
+    },
+    "Education": {
+        "excellent": "Strong academic background with prestigious institution",
+        "good": "Solid educational foundation, GPA mentioned",
+        "moderate": "Education listed but lacks GPA or institution prestige",
+        "poor": "Education section needs significant detail",
+    },
+    "Work Experience": {
+        "excellent": "Strong work history with quantified impact metrics",
+        "good": "Good experience, some quantified results",
+        "moderate": "Work experience listed but lacks quantified achievements",
+        "poor": "Limited or no work experience demonstrated",
+    },
+    "Skills": {
+        "excellent": "Comprehensive and role-relevant technical skill set",
+        "good": "Good skill coverage, minor gaps in stack",
+        "moderate": "Basic skills listed, needs deeper technical depth",
+        "poor": "Skills section is underdeveloped",
+    },
+    "Projects": {
+        "excellent": "Strong portfolio of relevant projects with live demonstrations",
+        "good": "Good projects, could add more metrics and GitHub links",
+        "moderate": "Projects listed but lack depth or public links",
+        "poor": "Very few or irrelevant projects in portfolio",
+    },
+    "Achievements": {
+        "excellent": "Notable awards, publications, or certifications listed",
+        "good": "Some recognitions and certifications present",
+        "moderate": "Few achievements mentioned, needs more specificity",
+        "poor": "No achievements or certifications listed",
+    },
+    "Summary": {
+        "excellent": "Clear, targeted, and role-specific professional summary",
+        "good": "Good summary with clear career objective",
+        "moderate": "Summary is generic, not tailored to role",
+        "poor": "Missing or very vague professional summary",
+    },
+    "Formatting": {
+        "excellent": "ATS-optimized, consistent layout, professional design",
+        "good": "Clean layout with minor formatting inconsistencies",
+        "moderate": "Acceptable but has formatting issues that may affect ATS",
+        "poor": "Significant formatting issues detected",
+    },
+}
+DEFAULT_FEEDBACK = "Score computed from resume content"
+FEEDBACK_TEXTS = [t for levels in SECTION_FEEDBACK.values() for t in levels.values()] + [DEFAULT_FEEDBACK]
+_FEEDBACK_IDS = {t: i for i, t in enumerate(FEEDBACK_TEXTS)}
+
+
+def feedback_id(text: str) -> Union[int, str]:
+    """Id of a feedback sentence; text that is not in FEEDBACK_TEXTS (older rows) is returned as is."""
+    return _FEEDBACK_IDS.get(text, text)
 
 
 def get_section_feedback(section: str, score: float, level: str, text: str) -> str:
-    feedbacks = {
-        "Contact Info": {
-            "excellent": "All professional channels present — email, phone, LinkedIn, GitHub",
-            "good": "Most contact details present, missing one channel",
-            "moderate": "Basic contact info only, add LinkedIn/GitHub",
-            "poor": "Very minimal contact information provided",
-        },
-        "Education": {
-            "excellent": "Strong academic background with prestigious institution",
-            "good": "Solid educational foundation, GPA mentioned",
-            "moderate": "Education listed but lacks GPA or institution prestige",
-            "poor": "Education section needs significant detail",
-        },
-        "Work Experience": {
-            "excellent": "Strong work history with quantified impact metrics",
-            "good": "Good experience, some quantified results",
-            "moderate": "Work experience listed but lacks quantified achievements",
-            "poor": "Limited or no work experience demonstrated",
-        },
-        "Skills": {
-            "excellent": "Comprehensive and role-relevant technical skill set",
-            "good": "Good skill coverage, minor gaps in stack",
-            "moderate": "Basic skills listed, needs deeper technical depth",
-            "poor": "Skills section is underdeveloped",
-        },
-        "Projects": {
-            "excellent": "Strong portfolio of relevant projects with live demonstrations",
-            "good": "Good projects, could add more metrics and GitHub links",
-            "moderate": "Projects listed but lack depth or public links",
-            "poor": "Very few or irrelevant projects in portfolio",
-        },
-        "Achievements": {
-            "excellent": "Notable awards, publications, or certifications listed",
-            "good": "Some recognitions and certifications present",
-            "moderate": "Few achievements mentioned, needs more specificity",
-            "poor": "No achievements or certifications listed",
-        },
-        "Summary": {
-            "excellent": "Clear, targeted, and role-specific professional summary",
-            "good": "Good summary with clear career objective",
-            "moderate": "Summary is generic, not tailored to role",
-            "poor": "Missing or very vague professional summary",
-        },
-        "Formatting": {
-            "excellent": "ATS-optimized, consistent layout, professional design",
-            "good": "Clean layout with minor formatting inconsistencies",
-            "moderate": "Acceptable but has formatting issues that may affect ATS",
-            "poor": "Significant formatting issues detected",
-        },
-    }
-    return feedbacks.get(section, {}).get(level, "Score computed from resume content")
+    return SECTION_FEEDBACK.get(section, {}).get(level, DEFAULT_FEEDBACK)
 
 
-def generate_insights(candidate_name: str, sections: dict) -> list:
+def generate_insights(candidate_name: str, sections: dict, spans: Optional[dict] = None) -> list:
+    """Up to three insights; with `spans` (see segment_text) a missing section is called out."""
     insights = []
     sorted_sections = sorted(sections.items(), key=lambda x: x[1]["score"], reverse=True)
 
@@ -243,7 +558,11 @@ def generate_insights(candidate_name: str, sections: dict) -> list:
     elif bottom[1]["score"] < 78:
         insights.append({"type": "warning", "text": f"{bottom[0]} could be stronger with more detail"})
 
-    if mid[1]["level"] in ("moderate", "poor"):
+    missing = [s for s in SECTION_HEADERS if spans is not None and s not in spans]
+    if missing:
+        worst = max(missing, key=lambda s: SECTION_WEIGHTS[s])
+        insights.append({"type": "warning", "text": f"No {worst} section found — add a clear heading"})
+    elif mid[1]["level"] in ("moderate", "poor"):
         insights.append({"type": "warning", "text": f"Consider enhancing {mid[0]} for better ranking"})
     else:
         insights.append({"type": "success", "text": f"Well-rounded profile across most sections"})
@@ -253,58 +572,74 @@ def generate_insights(candidate_name: str, sections: dict) -> list:
 
 # ── TOPSIS ───────────────────────────────────────────────────────────────────
 
-def compute_topsis(candidates_sections: list) -> list:
+def compute_topsis(candidates_sections: list, weights: Optional[dict] = None) -> list:
     """
-    candidates_sections: list of dicts {section_name: score}
+    candidates_sections: list of dicts {criterion_name: score}
+    weights: {criterion_name: weight in %}, defaults to SECTION_WEIGHTS
     Returns list of TOPSIS scores in same order.
     """
     if not candidates_sections:
         return []
 
-    import numpy as np
+    np = registry.get("numpy")
+    from topsis import topsis
 
+    weight_map = SECTION_WEIGHTS if weights is None else weights
     section_names = list(candidates_sections[0].keys())
-    weights = [SECTION_WEIGHTS.get(s, 10) / 100 for s in section_names]
-    n = len(candidates_sections)
-    m = len(section_names)
 
-    matrix = np.array([[c[s] for s in section_names] for c in candidates_sections], dtype=float)
+    matrix = np.empty((len(candidates_sections), len(section_names)), dtype=np.float64)
+    for i, c in enumerate(candidates_sections):
+        matrix[i] = [c[s] for s in section_names]
 
-    # Normalize
-    col_norms = np.sqrt((matrix ** 2).sum(axis=0))
-    col_norms[col_norms == 0] = 1
-    norm = matrix / col_norms
+    scores = topsis(matrix, [weight_map.get(s, 10) / 100 for s in section_names], inplace=True)
+    return scores.tolist()
 
-    # Weighted
-    w = np.array(weights)
-    weighted = norm * w
 
-    # Ideal best & worst
-    best  = weighted.max(axis=0)
-    worst = weighted.min(axis=0)
+# ── MAIN PROCESSING ENTRY ────────────────────────────────────────────────────
 
-    # Distances
-    d_pos = np.sqrt(((weighted - best) ** 2).sum(axis=1))
-    d_neg = np.sqrt(((weighted - worst) ** 2).sum(axis=1))
+def process_resume(filename: str, source: Source, color_idx: int = 0) -> dict:
+    return analyze_text(filename, extract_text(filename, source), color_idx)
 
-    denom = d_pos + d_neg
-    denom[denom == 0] = 1
-    scores = d_neg / denom
 
-    return scores.tolist()
+def extract_and_analyze(filename: str, source: Source) -> tuple:
+    """
+    Returns (text, parsed, stats) so callers can cache the extracted text too.
+    stats carries extract/score seconds and the page count back from pool workers.
+    """
+    stats = {"pages": None}
+    start = time.perf_counter()
+    text = extract_text(filename, source, stats)
+    extracted = time.perf_counter()
+    parsed = analyze_text(filename, text)
+    stats["extract_s"] = extracted - start
+    stats["score_s"] = time.perf_counter() - extracted
+    return text, parsed, stats
 
 
-# ── MAIN PROCESSING ENTRY ────────────────────────────────────────────────────
+def get_initials(name: str) -> str:
+    return "".join(w[0].upper() for w in name.split()[:2]) or "??"
+
+
+def rename_analysis(parsed: dict, filename: str, text: str) -> dict:
+    """
+    Reuse an analysis for the same content under another filename. Only the
+    name (whose fallback is the filename) and its initials depend on it.
+    """
+    name = extract_name(text, filename)
+    return {**parsed, "filename": filename, "name": name, "avatar": get_initials(name)}
+
 
-def process_resume(filename: str, file_bytes: bytes, color_idx: int = 0) -> dict:
-    text = extract_text(filename, file_bytes)
+def analyze_text(filename: str, text: str, color_idx: int = 0) -> dict:
+    scan = scan_text(text)
+    spans = scan["spans"]
 
-    # Score each section
+    # Score each section (on its own span when the resume has headers)
     sections = {}
     for section in SECTION_WEIGHTS:
-        score = score_section(text, section)
+        score = score_section(text, section, scan)
         level = get_level(score)
-        feedback = get_section_feedback(section, score, level, text)
+        span = text if spans is None or section not in SECTION_HEADERS else spans.get(section, "")
+        feedback = get_section_feedback(section, score, level, span)
         sections[section] = {
             "score": round(score, 1),
             "weight": SECTION_WEIGHTS[section],
@@ -318,19 +653,19 @@ def process_resume(filename: str, file_bytes: bytes, color_idx: int = 0) -> dict
 
     name     = extract_name(text, filename)
     keywords = extract_keywords(text)
-    insights = generate_insights(name, sections)
+    insights = generate_insights(name, sections, spans)
 
-    initials = "".join(w[0].upper() for w in name.split()[:2]) or "??"
-    color    = AVATAR_COLORS[color_idx % len(AVATAR_COLORS)]
+    initials = get_initials(name)
+    color    = get_avatar_color(color_idx)
 
     return {
         "filename": filename,
         "name":  name,
         "role":  "Candidate",
-        "email": extract_email(text),
-        "phone": extract_phone(text),
-        "education":  extract_education(text),
-        "experience": extract_experience_years(text),
+        "email": scan["email"],
+        "phone": scan["phone"],
+        "education":  scan["education"],
+        "experience": scan["experience"],
         "location":   extract_location(text),
         "total_score": round(total, 1),
         "grade":       grade,
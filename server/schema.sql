@@ -21,12 +21,15 @@ CREATE TABLE IF NOT EXISTS batches (
     job_title   TEXT,
     job_desc    TEXT,
     status      TEXT NOT NULL DEFAULT 'processing',
+    candidate_count INTEGER NOT NULL DEFAULT 0,
+    timings     JSONB,                 -- per-stage seconds of the last analyze/append run
     created_at  TIMESTAMP DEFAULT NOW()
 );
 
 CREATE TABLE IF NOT EXISTS candidates (
     id              SERIAL PRIMARY KEY,
     batch_id        INTEGER REFERENCES batches(id) ON DELETE CASCADE,
+    user_id         INTEGER REFERENCES users(id) ON DELETE CASCADE,
     name            TEXT NOT NULL,
     role            TEXT,
     email           TEXT,
@@ -36,6 +39,7 @@ CREATE TABLE IF NOT EXISTS candidates (
     location        TEXT,
     total_score     FLOAT NOT NULL DEFAULT 0,
     topsis_score    FLOAT NOT NULL DEFAULT 0,
+    relevance       FLOAT,
     grade           TEXT,
     grade_color     TEXT,
     rank_position   INTEGER,
@@ -63,7 +67,11 @@ CREATE TABLE IF NOT EXISTS insights (
 );
 
 -- Useful indexes
-CREATE INDEX IF NOT EXISTS idx_batches_user ON batches(user_id);
-CREATE INDEX IF NOT EXISTS idx_candidates_batch ON candidates(batch_id);
+CREATE INDEX IF NOT EXISTS idx_batches_user_created ON batches(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_batch_rank ON candidates(batch_id, rank_position);
 CREATE INDEX IF NOT EXISTS idx_sections_candidate ON sections(candidate_id);
 CREATE INDEX IF NOT EXISTS idx_insights_candidate ON insights(candidate_id);
+CREATE INDEX IF NOT EXISTS idx_candidates_keywords ON candidates USING GIN (keywords);
+CREATE INDEX IF NOT EXISTS idx_candidates_user_score ON candidates(user_id, total_score DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_user_location ON candidates(user_id, location);
+CREATE INDEX IF NOT EXISTS idx_candidates_user_grade ON candidates(user_id, grade);
@@ -0,0 +1,48 @@
+"""
+RankSense AI — Response serialization
+Ranking payloads are plain dicts/lists/floats built by our own code, so they
+are encoded straight to bytes (orjson when installed, stdlib json otherwise)
+instead of going through FastAPI's jsonable_encoder. Compact payloads carry
+feedback ids instead of the repeated per-section sentences; the ids are
+emitted while the payload is built (compact_sections, or feedback_id() on
+rows loaded from the database), and feedback_table() lists the texts used.
+"""
+import json
+from typing import Any, Dict, Set
+
+from fastapi.responses import JSONResponse
+
+from resume_parser import FEEDBACK_TEXTS, feedback_id
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=str, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with dumps(); content must already be JSON-ready."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def compact_sections(sections: dict, used: Set) -> dict:
+    """Sections with "feedback" replaced by its id; ids are added to `used`."""
+    out = {}
+    for name, sec in sections.items():
+        fid = feedback_id(sec["feedback"])
+        used.add(fid)
+        out[name] = {**sec, "feedback": fid}
+    return out
+
+
+def feedback_table(used: Set) -> Dict[str, str]:
+    """{"id": text} for the ids in `used` (string keys: JSON object keys)."""
+    return {str(i): FEEDBACK_TEXTS[i] for i in sorted(i for i in used if isinstance(i, int))}
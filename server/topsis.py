@@ -0,0 +1,138 @@
+"""
+RankSense AI — TOPSIS engine
+Array-in / array-out TOPSIS that avoids full-size temporaries: the decision
+matrix is scaled in place, distances are computed in row chunks, and top-k
+selection uses argpartition instead of a full sort. StreamingTopsis ranks
+pools too large to hold in memory with two passes over chunked input (e.g. a
+server-side cursor over the sections table).
+"""
+from typing import Callable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 65536
+
+
+def _criteria(weights: Sequence[float], benefit: Optional[Sequence[bool]], dtype) -> Tuple[np.ndarray, np.ndarray]:
+    w = np.asarray(weights, dtype=dtype)
+    b = np.ones(len(w), dtype=bool) if benefit is None else np.asarray(benefit, dtype=bool)
+    return w, b
+
+
+def _ideals(col_max: np.ndarray, col_min: np.ndarray, scale: np.ndarray, benefit: np.ndarray):
+    """Ideal best/worst of the weighted matrix, derived from raw column extremes (scale >= 0)."""
+    hi, lo = col_max * scale, col_min * scale
+    return np.where(benefit, hi, lo), np.where(benefit, lo, hi)
+
+
+def _closeness(block: np.ndarray, best: np.ndarray, worst: np.ndarray, out: np.ndarray):
+    """Relative closeness of each (already weighted) row of `block`, written into `out`."""
+    diff = block - best
+    d_pos = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    np.subtract(block, worst, out=diff)
+    d_neg = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    denom = d_pos + d_neg
+    denom[denom == 0] = 1
+    np.divide(d_neg, denom, out=out)
+
+
+def topsis(matrix: np.ndarray, weights: Sequence[float], benefit: Optional[Sequence[bool]] = None,
+           out: Optional[np.ndarray] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+           inplace: bool = False) -> np.ndarray:
+    """
+    matrix: (n, m) float32/float64 decision matrix, one row per candidate.
+    weights: m criterion weights (any scale). benefit: per-criterion True (higher
+    is better, default) or False (cost criterion).
+    inplace: scale `matrix` in place instead of working on a copy.
+    Returns (or fills `out` with) the n closeness scores in [0, 1].
+    """
+    matrix = np.asarray(matrix)
+    if matrix.dtype not in (np.float32, np.float64):
+        matrix = matrix.astype(np.float64)
+    elif not inplace:
+        matrix = matrix.copy()
+    n = matrix.shape[0]
+    if out is None:
+        out = np.empty(n, dtype=matrix.dtype)
+    if n == 0:
+        return out
+
+    w, b = _criteria(weights, benefit, matrix.dtype)
+    norms = np.sqrt(np.einsum("ij,ij->j", matrix, matrix))
+    norms[norms == 0] = 1
+    scale = w / norms
+    col_max, col_min = matrix.max(axis=0), matrix.min(axis=0)
+    best, worst = _ideals(col_max, col_min, scale, b)
+
+    for start in range(0, n, chunk_rows):
+        block = matrix[start:start + chunk_rows]
+        block *= scale
+        _closeness(block, best, worst, out[start:start + chunk_rows])
+    return out
+
+
+def rank_order(scores: np.ndarray) -> np.ndarray:
+    """Indices of `scores` from best to worst (stable for ties)."""
+    return np.argsort(-scores, kind="stable")
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best scores, best first, without sorting the whole array."""
+    n = len(scores)
+    if k >= n:
+        return rank_order(scores)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class StreamingTopsis:
+    """
+    Two-pass TOPSIS over chunked input. `chunks` is a callable returning a fresh
+    iterable of (ids, matrix_chunk) pairs; it is consumed twice:
+      1. column sums of squares and min/max (the only global statistics TOPSIS needs)
+      2. closeness per chunk, keeping a running top-k
+    Memory stays O(chunk + k) regardless of pool size.
+    """
+
+    def __init__(self, weights: Sequence[float], benefit: Optional[Sequence[bool]] = None,
+                 dtype=np.float64):
+        self.dtype = dtype
+        self.weights, self.benefit = _criteria(weights, benefit, dtype)
+
+    def rank(self, chunks: Callable[[], Iterable[Tuple[np.ndarray, np.ndarray]]], k: int):
+        """Returns (ids, scores) of the top k candidates, best first, and the pool size."""
+        m = len(self.weights)
+        sumsq = np.zeros(m, dtype=np.float64)
+        col_max = np.full(m, -np.inf)
+        col_min = np.full(m, np.inf)
+        total = 0
+        for _, block in chunks():
+            block = np.asarray(block, dtype=self.dtype)
+            if not len(block):
+                continue
+            sumsq += np.einsum("ij,ij->j", block, block, dtype=np.float64)
+            np.maximum(col_max, block.max(axis=0), out=col_max)
+            np.minimum(col_min, block.min(axis=0), out=col_min)
+            total += len(block)
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.dtype), 0
+
+        norms = np.sqrt(sumsq)
+        norms[norms == 0] = 1
+        scale = (self.weights / norms).astype(self.dtype)
+        best, worst = _ideals(col_max.astype(self.dtype), col_min.astype(self.dtype), scale, self.benefit)
+
+        top_ids = np.empty(0, dtype=np.int64)
+        top_scores = np.empty(0, dtype=self.dtype)
+        for ids, block in chunks():
+            block = np.array(block, dtype=self.dtype)   # own copy, scaled in place
+            if not len(block):
+                continue
+            block *= scale
+            scores = np.empty(len(block), dtype=self.dtype)
+            _closeness(block, best, worst, scores)
+            merged_ids = np.concatenate([top_ids, np.asarray(ids, dtype=np.int64)])
+            merged_scores = np.concatenate([top_scores, scores])
+            keep = top_k(merged_scores, k)
+            top_ids, top_scores = merged_ids[keep], merged_scores[keep]
+        return top_ids, top_scores, total